@@ -0,0 +1,86 @@
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from housing.batch_io import read_batch
+from housing.data_preparation import prepare_data
+from housing.logging_utils import add_logging_arguments, configure_logging_from_args
+from housing.synthetic_data import synthetic_housing
+
+
+def write_inputs(data, directory):
+    paths = {
+        "json": os.path.join(directory, "batch.json"),
+        "arrow": os.path.join(directory, "batch.arrow"),
+        "numpy": os.path.join(directory, "batch.npy"),
+    }
+    data.to_json(paths["json"], orient="records")
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    with pa.OSFile(paths["arrow"], "wb") as f:
+        with pa.ipc.new_stream(f, table.schema) as writer:
+            writer.write_table(table)
+    dtype = [(col, "f8") for col in data.columns[:-1]] + [("ocean_proximity", "U10")]
+    np.save(paths["numpy"], data.to_records(index=False).astype(dtype))
+    return paths
+
+
+def load_features(path, input_format):
+    # The JSON path mirrors scripts/infer.py: parse, build a frame, prepare
+    if input_format == "json":
+        with open(path) as f:
+            return prepare_data(pd.DataFrame(json.load(f)))[0]
+    return prepare_data(read_batch(path, input_format))[0]
+
+
+def benchmark(model, n_rows, formats):
+    data = synthetic_housing(n_rows)
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_inputs(data, directory)
+        for input_format in formats:
+            start = time.perf_counter()
+            X = load_features(paths[input_format], input_format)
+            load_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            model.predict(X)
+            predict_s = time.perf_counter() - start
+            results.append(
+                {
+                    "format": input_format,
+                    "rows": n_rows,
+                    "load_s": load_s,
+                    "predict_s": predict_s,
+                    "rows_per_s": n_rows / (load_s + predict_s),
+                }
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Batch Inference Input")
+    parser.add_argument("--model", required=True, help="Path to model")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument(
+        "--formats", nargs="+", default=["json", "arrow", "numpy"], help="Formats"
+    )
+    add_logging_arguments(parser)
+    args = parser.parse_args()
+
+    configure_logging_from_args(args)
+
+    logging.info(f"Benchmarking {args.rows} row batches...")
+    results = benchmark(joblib.load(args.model), args.rows, args.formats)
+    print(pd.DataFrame(results).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from housing.logging_utils import add_logging_arguments, configure_logging_from_args
+from housing.spatial_features import SpatialNeighborIndex
+from housing.synthetic_data import synthetic_housing
+
+
+def benchmark(n_points, k, batch_rows, single_queries):
+    data = synthetic_housing(n_points)
+    target = data.pop("median_house_value")
+    index = SpatialNeighborIndex(k=k)
+
+    start = time.perf_counter()
+    index.fit(data, target)
+    build_s = time.perf_counter() - start
+
+    batch = data.iloc[: min(batch_rows, n_points)]
+    start = time.perf_counter()
+    index.transform(batch, leave_one_out=True)
+    batch_s = time.perf_counter() - start
+
+    latencies = []
+    for row in range(single_queries):
+        one = data.iloc[[row]]
+        start = time.perf_counter()
+        index.transform(one)
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        "points": n_points,
+        "build_s": build_s,
+        "batch_rows": len(batch),
+        "batch_rows_per_s": len(batch) / batch_s,
+        "single_row_p50_ms": np.percentile(latencies, 50) * 1e3,
+        "single_row_p99_ms": np.percentile(latencies, 99) * 1e3,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Spatial Neighbor Index")
+    parser.add_argument("--points", type=int, nargs="+", default=[20_000, 10_000_000])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument(
+        "--batch-rows", type=int, default=1_000_000, help="Rows in the batch query"
+    )
+    parser.add_argument("--single-queries", type=int, default=200)
+    add_logging_arguments(parser)
+    args = parser.parse_args()
+
+    configure_logging_from_args(args)
+
+    results = []
+    for n_points in args.points:
+        logging.info(f"Benchmarking spatial index over {n_points} points...")
+        results.append(
+            benchmark(n_points, args.k, args.batch_rows, args.single_queries)
+        )
+    print(pd.DataFrame(results).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import argparse
+import logging
+import os
+
+import joblib
+import mlflow
+import numpy as np
+import yaml
+
+from housing.data_preparation import load_data, prepare_data, stratified_split
+from housing.logging_utils import add_logging_arguments, configure_logging_from_args
+from housing.model_distillation import distill_model
+from housing.model_scoring import score_models
+from housing.profiling import add_profiling_arguments, profile_from_args
+from housing.spatial_features import apply_spatial_features
+from housing.tracking import MlflowTracker
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distill Housing Model")
+    parser.add_argument(
+        "--config", default="config/config.yaml", help="Path to config YAML"
+    )
+    add_logging_arguments(parser)
+    add_profiling_arguments(parser)
+    parser.add_argument("--mlflow", action="store_true", help="Enable MLflow tracking")
+    args = parser.parse_args()
+
+    # Configure logging
+    configure_logging_from_args(args)
+
+    with profile_from_args(args, "distill"):
+        # Start MLflow run if enabled
+        if args.mlflow:
+            run_id = os.environ.get("MLFLOW_RUN_ID")
+            if run_id:
+                mlflow.start_run(run_id=run_id)
+            else:
+                mlflow.set_experiment("Housing Experiment")
+                mlflow.start_run(run_name="Model Distillation", nested=True)
+            tracker = MlflowTracker.from_active_run()
+            logging.info("MLflow tracking started for distillation.")
+
+        with open(args.config) as f:
+            config = yaml.safe_load(f)
+        distill_config = dict(config["distillation"])
+        teacher_type = distill_config.pop("teacher")
+        student_type = distill_config.pop("student")
+
+        logging.info("Getting & Processing the data...")
+        df = load_data(args.config)
+        train_set, test_set = stratified_split(
+            df, splits=config["splits"], testsize=config["test_size"]
+        )
+        X_train, _ = prepare_data(
+            train_set.drop(config["target"], axis=1), feature_spec=config["features"]
+        )
+        X_test, _ = prepare_data(
+            test_set.drop(config["target"], axis=1), feature_spec=config["features"]
+        )
+        X_train = apply_spatial_features(X_train, train_set, config, leave_one_out=True)
+        X_test = apply_spatial_features(X_test, test_set, config)
+        y_test = test_set[config["target"]]
+
+        # Train the student on the teacher's predictions
+        teacher = joblib.load(config[teacher_type])
+        student = distill_model(teacher, X_train, student_type, **distill_config)
+
+        student_path = config["distilled_model"]
+        os.makedirs(os.path.dirname(student_path), exist_ok=True)
+        joblib.dump(student, student_path)
+        logging.info(f"Distilled {student_type} model saved at: {student_path}")
+
+        # Accuracy / latency / size trade-off against the teacher
+        comparison = score_models(
+            {teacher_type: config[teacher_type], "distilled_model": student_path},
+            X_test,
+            y_test,
+        )
+        fidelity = np.sqrt(
+            np.mean((teacher.predict(X_test) - student.predict(X_test)) ** 2)
+        )
+        logging.info(f"Teacher vs student:\n{comparison.to_string()}")
+        logging.info(f"Student RMSE against teacher predictions: {fidelity}")
+
+        if args.mlflow:
+            student_row = comparison.loc["distilled_model"]
+            teacher_row = comparison.loc[teacher_type]
+            tracker.log_params(
+                {"teacher": teacher_type, "student": student_type, **distill_config}
+            )
+            tracker.log_metrics(
+                {
+                    "Student Test RMSE": student_row["rmse"],
+                    "Teacher Test RMSE": teacher_row["rmse"],
+                    "Student Fidelity RMSE": fidelity,
+                    "Latency Speedup": teacher_row["latency_per_row_us"]
+                    / student_row["latency_per_row_us"],
+                    "Size Ratio": student_row["model_size_mb"]
+                    / teacher_row["model_size_mb"],
+                }
+            )
+            tracker.close()
+            mlflow.end_run()
+            logging.info("MLflow run ended for distillation.")
+
+
+if __name__ == "__main__":
+    main()
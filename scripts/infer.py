@@ -1,71 +1,202 @@
 import argparse
 import json
 import logging
+import os
 
+import joblib
 import pandas as pd
+import yaml
 
+from housing.batch_io import INPUT_FORMATS, read_batch, write_predictions
 from housing.data_preparation import prepare_data
-from housing.logging_utils import configure_logging
+from housing.feature_spec import DEFAULT_FEATURE_SPEC
+from housing.logging_utils import add_logging_arguments, configure_logging_from_args
 from housing.model_scoring import evaluate_model
+from housing.prediction_cache import PredictionCache, artifact_version
+from housing.profiling import add_profiling_arguments, profile_from_args
+from housing.spatial_features import apply_spatial_features
+from housing.streaming_metrics import RegressionAccumulator
 
+logger = logging.getLogger(__name__)
 
-def preprocess(input_df):
+
+def load_imputer(config=None):
+    # The imputer fitted in training keeps a row's imputed values, and so its
+    # prediction, independent of the other rows in the batch
+    imputer_path = (config or {}).get("imputer_path")
+    if not imputer_path:
+        return None
+    if not os.path.exists(imputer_path):
+        logger.warning(
+            "No fitted imputer at %s, medians come from each batch", imputer_path
+        )
+        return None
+    return joblib.load(imputer_path)
+
+
+def preprocess(input_df, config=None, imputer=None):
     # Creating y variables
     y_test = input_df["median_house_value"]
-    # Preparing data
-    X_test, _ = prepare_data(input_df.drop("median_house_value", axis=1))
-    logging.info("Processing complete.")
+    # Preparing data with the training feature spec when a config is given
+    feature_spec = config["features"] if config else None
+    X_test, _ = prepare_data(
+        input_df.drop("median_house_value", axis=1),
+        feature_spec=feature_spec,
+        imputer=imputer,
+    )
+    if config:
+        X_test = apply_spatial_features(X_test, input_df, config)
+    logger.info("Processing complete.")
     return X_test, y_test
 
 
+def cache_version(model_path, config=None):
+    # Predictions also depend on the feature spec, the fitted imputer and
+    # the spatial index, so any of them changing invalidates the cache
+    config = config or {}
+    spatial_config = config.get("spatial_features", {})
+    return artifact_version(
+        model_path,
+        config.get("imputer_path"),
+        spatial_config["index_path"] if spatial_config.get("enabled") else None,
+        feature_spec=config.get("features", DEFAULT_FEATURE_SPEC),
+    )
+
+
+def cached_inference(args, input_df, X, imputer=None, config=None):
+    cache = PredictionCache.load(
+        args.cache_path, cache_version(args.model, config), max_entries=args.cache_size
+    )
+    model = None
+
+    def predict_misses(raw_df):
+        # The model is only loaded when at least one row misses the cache;
+        # misses are predicted from the same prepared rows that are written out
+        nonlocal model
+        if model is None:
+            model = joblib.load(args.model)
+        return model.predict(X.loc[raw_df.index])
+
+    # Without a fitted imputer, rows with missing values are imputed from
+    # their batch, so they are predicted every time rather than cached
+    preds = cache.predict(
+        input_df, predict_misses, cache_incomplete=imputer is not None
+    )
+    cache.save(args.cache_path)
+    logger.info("Prediction cache stats: %s", cache.stats())
+    return preds
+
+
+def batch_inference(args, config=None, imputer=None):
+    # Arrow and NumPy batches go straight into the feature matrix; the
+    # predictions are written back in the same format
+    columns = read_batch(args.input, args.input_format)
+    feature_spec = config["features"] if config else None
+    X, _ = prepare_data(columns, feature_spec=feature_spec, imputer=imputer)
+    if config:
+        X = apply_spatial_features(X, columns, config)
+
+    logger.info("Running inference on %d rows...", len(X))
+    preds = joblib.load(args.model).predict(X)
+    if "median_house_value" in columns:
+        metrics = RegressionAccumulator().update(columns["median_house_value"], preds)
+        logger.info(
+            "Batch scoring completed with Test RMSE:%s & MAE:%s (R2:%s, bias:%s)",
+            metrics.rmse,
+            metrics.mae,
+            metrics.r2,
+            metrics.bias,
+        )
+    write_predictions(preds, args.output, args.input_format)
+    logger.info("Inference complete.")
+
+
 def main(args):
     # Configure logging
-    configure_logging(
-        log_level=args.log_level,
-        log_path=args.log_path,
-        console_log=not args.no_console_log,
-    )
+    configure_logging_from_args(args)
+
+    config = None
+    if args.config:
+        with open(args.config) as f:
+            config = yaml.safe_load(f)
+
+    imputer = load_imputer(config)
+
+    if args.input_format != "json":
+        batch_inference(args, config, imputer)
+        return
 
     # Load input data from JSON
-    logging.info("Loading data from JSON input...")
+    logger.info("Loading data from JSON input...")
     try:
         input_data = json.loads(args.input)
         input_df = pd.DataFrame(input_data)
     except Exception as e:
-        logging.error(f"Failed to parse input JSON: {e}")
+        logger.error("Failed to parse input JSON: %s", e)
         raise
 
-    # Preprocessing Data
-    logging.info("Preprocessing data...")
-    X, y = preprocess(input_df)
+    # Preprocessing Data; every row is prepared so the output has the same
+    # columns with or without the cache
+    logger.info("Preprocessing data...")
+    X, y = preprocess(input_df, config, imputer)
 
-    # Calling evalutaion
-    logging.info("Running inference...")
-    preds, rmse, mae = evaluate_model(args.model, X, y)
-    logging.info(f"Model scoring completed with Test RMSE:{rmse} & MAE:{mae}")
+    if args.cache_path:
+        # Cache hits skip the model
+        logger.info("Running cached inference...")
+        preds = cached_inference(args, input_df, X, imputer, config)
+        metrics = RegressionAccumulator().update(y, preds)
+        rmse, mae = metrics.rmse, metrics.mae
+    else:
+        # Calling evalutaion
+        logger.info("Running inference...")
+        preds, rmse, mae = evaluate_model(args.model, X, y)
+    logger.info("Model scoring completed with Test RMSE:%s & MAE:%s", rmse, mae)
 
-    logging.info("Saving predictions...")
+    logger.info("Saving predictions...")
     output_df = X.copy()
     output_df["prediction"] = preds
     output_df["rmse"] = rmse
     output_df["mae"] = mae
     output_df.to_csv(args.output, index=False)
 
-    logging.info("Inference complete.")
+    logger.info("Inference complete.")
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Inference")
     parser.add_argument("--model", required=True, help="Path to model")
-    parser.add_argument("--input", required=True, help="Input Data JSON")
-    parser.add_argument("--output", required=True, help="Path to output CSV")
     parser.add_argument(
-        "--log-level", default="INFO", help="Logging level (e.g. DEBUG, INFO)"
+        "--input",
+        required=True,
+        help="Input Data JSON, or a batch file path ('-' for stdin) for arrow/numpy",
+    )
+    parser.add_argument(
+        "--output",
+        required=True,
+        help="Path to output CSV, or batch file path ('-' for stdout) for arrow/numpy",
+    )
+    parser.add_argument(
+        "--input-format",
+        choices=INPUT_FORMATS,
+        default="json",
+        help="arrow: Arrow IPC stream/file, numpy: .npy record array",
+    )
+    # Same features as training; the built-in default spec when no config is given
+    parser.add_argument("--config", help="Optional config YAML with the feature spec")
+    parser.add_argument(
+        "--cache-path", help="Optional prediction cache file reused across calls"
     )
-    parser.add_argument("--log-path", help="Optional log file path")
     parser.add_argument(
-        "--no-console-log", action="store_true", help="Suppress console logging"
+        "--cache-size",
+        type=int,
+        default=100_000,
+        help="Maximum cached rows before least recently used rows are evicted",
     )
+    add_logging_arguments(parser)
+    add_profiling_arguments(parser)
     args = parser.parse_args()
+    if args.cache_path and args.input_format != "json":
+        parser.error("--cache-path is only supported with JSON input")
 
-    main(args)
+    with profile_from_args(args, "infer"):
+        main(args)
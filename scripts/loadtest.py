@@ -0,0 +1,138 @@
+import argparse
+import json
+import logging
+import os
+import time
+
+import yaml
+
+from housing.load_testing import (
+    CliTarget,
+    HttpTarget,
+    ResourceSampler,
+    compare_reports,
+    load_request_log,
+    run_load,
+    save_report,
+    summarize_load,
+    synthetic_requests,
+)
+from housing.logging_utils import add_logging_arguments, configure_logging_from_args
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load Test Inference")
+    parser.add_argument(
+        "--config", default="config/config.yaml", help="Path to config YAML"
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument(
+        "--requests", help="JSONL request log, one record or list of records per line"
+    )
+    source.add_argument(
+        "--synthetic", type=int, default=1000, help="Synthetic requests to generate"
+    )
+    parser.add_argument("--rows-per-request", type=int, default=1)
+    parser.add_argument(
+        "--target",
+        default="http://127.0.0.1:8000/predict",
+        help="Serving endpoint URL, or 'cli' to run scripts/infer.py per request",
+    )
+    parser.add_argument("--model", help="Model for the cli target (default: final)")
+    parser.add_argument("--qps", type=float, help="Open-loop target request rate")
+    parser.add_argument(
+        "--concurrency", type=int, default=1, help="Concurrent requests in flight"
+    )
+    parser.add_argument("--num-requests", type=int, help="Stop after N requests")
+    parser.add_argument("--duration", type=float, help="Stop after N seconds")
+    parser.add_argument(
+        "--pid", type=int, help="Server process to sample CPU/RSS from (with children)"
+    )
+    parser.add_argument("--output", help="Report JSON path")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BEFORE", "AFTER"),
+        help="Compare two saved reports instead of running a test",
+    )
+    add_logging_arguments(parser)
+    args = parser.parse_args()
+
+    configure_logging_from_args(args)
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            before = json.load(f)
+        with open(args.compare[1]) as f:
+            after = json.load(f)
+        print(compare_reports(before, after).to_string())
+        return
+
+    with open(args.config) as f:
+        config = yaml.safe_load(f)
+
+    if args.requests:
+        payloads = load_request_log(args.requests)
+    else:
+        payloads = synthetic_requests(args.synthetic, args.rows_per_request)
+    logging.info(f"Loaded {len(payloads)} request payloads")
+
+    if args.target == "cli":
+        model = args.model or config[config["final_model"]]
+        target = CliTarget(model, config=args.config)
+    else:
+        target = HttpTarget(args.target)
+
+    # Without --pid this process is sampled, which covers the CLI runs it spawns
+    # but not a separate server
+    if args.pid is None and args.target != "cli":
+        logging.warning(
+            "No --pid given: CPU and RSS are sampled from the load generator, "
+            "not the server"
+        )
+    sampler = ResourceSampler(pid=args.pid)
+    sampler.start()
+    results, wall_time = run_load(
+        target,
+        payloads,
+        n_requests=args.num_requests,
+        duration=args.duration,
+        qps=args.qps,
+        concurrency=args.concurrency,
+    )
+    samples = sampler.stop()
+
+    settings = {
+        key: getattr(args, key)
+        for key in (
+            "target",
+            "requests",
+            "synthetic",
+            "rows_per_request",
+            "qps",
+            "concurrency",
+            "num_requests",
+            "duration",
+        )
+    }
+    report = summarize_load(results, wall_time, samples, settings)
+    latency = report["latency_ms"]
+    if report["requests"]:
+        logging.info(
+            f"{report['requests']} requests in {wall_time:.1f}s: "
+            f"{report['throughput_rps']:.1f} req/s, "
+            f"errors {report['error_rate']:.2%}, "
+            f"p50 {latency['p50']:.1f}ms p90 {latency['p90']:.1f}ms "
+            f"p99 {latency['p99']:.1f}ms max {latency['max']:.1f}ms"
+        )
+    else:
+        logging.warning(f"No requests completed in {wall_time:.1f}s")
+
+    output = args.output or os.path.join(
+        config["load_test_path"], f"loadtest-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    save_report(report, output)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,18 @@ import os
 import subprocess
 
 import mlflow
+import yaml
 
+from housing.logging_utils import add_logging_arguments, configure_logging_from_args
+from housing.profiling import (
+    add_profiling_arguments,
+    profile_from_args,
+    profiling_passthrough_args,
+)
+from housing.stage_cache import StageCache, fingerprint
 
-def run_data_preparation(config_path, mlflow_enabled):
+
+def run_data_preparation(config_path, mlflow_enabled, extra_args=()):
     if mlflow_enabled:
         # Start MLflow run for data preparation
         with mlflow.start_run(run_name="Data Preparation", nested=True) as run:
@@ -18,17 +27,29 @@ def run_data_preparation(config_path, mlflow_enabled):
             env["MLFLOW_TRACKING_URI"] = mlflow.get_tracking_uri()
 
             subprocess.run(
-                ["python", "scripts/ingest.py", "--config", config_path, "--mlflow"],
+                [
+                    "python",
+                    "scripts/ingest.py",
+                    "--config",
+                    config_path,
+                    "--mlflow",
+                    *extra_args,
+                ],
                 env=env,
                 check=True,
             )
 
             mlflow.log_metric("ingestion_complete", 1)
     else:
-        subprocess.run(["python", "scripts/ingest.py", "--config", config_path])
+        subprocess.run(
+            ["python", "scripts/ingest.py", "--config", config_path, *extra_args],
+            check=True,
+        )
 
 
-def run_model_training(config_path, mlflow_enabled):
+def run_model_training(config_path, mlflow_enabled, models=None, extra_args=()):
+    # Only the listed model types are retrained when given
+    model_args = ["--models", *models] if models else []
     if mlflow_enabled:
         # Start MLflow run for model training
         with mlflow.start_run(run_name="Model Training", nested=True) as run:
@@ -40,16 +61,65 @@ def run_model_training(config_path, mlflow_enabled):
             env["MLFLOW_TRACKING_URI"] = mlflow.get_tracking_uri()
 
             subprocess.run(
-                ["python", "scripts/train.py", "--config", config_path, "--mlflow"],
+                [
+                    "python",
+                    "scripts/train.py",
+                    "--config",
+                    config_path,
+                    "--mlflow",
+                    *model_args,
+                    *extra_args,
+                ],
                 env=env,
                 check=True,
             )
             mlflow.log_metric("model_training_complete", 1)
     else:
-        subprocess.run(["python", "scripts/train.py", "--config", config_path])
+        subprocess.run(
+            [
+                "python",
+                "scripts/train.py",
+                "--config",
+                config_path,
+                *model_args,
+                *extra_args,
+            ],
+            check=True,
+        )
+
+
+def run_model_distillation(config_path, mlflow_enabled, extra_args=()):
+    if mlflow_enabled:
+        # Start MLflow run for model distillation
+        with mlflow.start_run(run_name="Model Distillation", nested=True) as run:
+            logging.info(f"Model Distillation Run ID:{run.info.run_id}")
+            mlflow.log_param("config_path", config_path)
+
+            env = os.environ.copy()
+            env["MLFLOW_RUN_ID"] = run.info.run_id
+            env["MLFLOW_TRACKING_URI"] = mlflow.get_tracking_uri()
+
+            subprocess.run(
+                [
+                    "python",
+                    "scripts/distill.py",
+                    "--config",
+                    config_path,
+                    "--mlflow",
+                    *extra_args,
+                ],
+                env=env,
+                check=True,
+            )
+            mlflow.log_metric("model_distillation_complete", 1)
+    else:
+        subprocess.run(
+            ["python", "scripts/distill.py", "--config", config_path, *extra_args],
+            check=True,
+        )
 
 
-def run_model_scoring(config_path, mlflow_enabled):
+def run_model_scoring(config_path, mlflow_enabled, extra_args=()):
     if mlflow_enabled:
         # Start MLflow run for model scoring
         with mlflow.start_run(run_name="Model Scoring", nested=True) as run:
@@ -61,16 +131,28 @@ def run_model_scoring(config_path, mlflow_enabled):
             env["MLFLOW_TRACKING_URI"] = mlflow.get_tracking_uri()
 
             subprocess.run(
-                ["python", "scripts/score.py", "--config", config_path, "--mlflow"],
+                [
+                    "python",
+                    "scripts/score.py",
+                    "--config",
+                    config_path,
+                    "--mlflow",
+                    *extra_args,
+                ],
                 env=env,
                 check=True,
             )
             mlflow.log_metric("model_scoring_complete", 1)
     else:
-        subprocess.run(["python", "scripts/score.py", "--config", config_path])
+        subprocess.run(
+            ["python", "scripts/score.py", "--config", config_path, *extra_args],
+            check=True,
+        )
 
 
-def run_model_monitoring(config_path, mlflow_enabled, thresh, drift_thresh):
+def run_model_monitoring(
+    config_path, mlflow_enabled, thresh, drift_thresh, extra_args=()
+):
     logging.info("Starting model monitoring...")
 
     env = os.environ.copy()
@@ -92,6 +174,7 @@ def run_model_monitoring(config_path, mlflow_enabled, thresh, drift_thresh):
                     str(thresh),
                     "--drift_threshold",
                     str(drift_thresh),
+                    *extra_args,
                 ],
                 env=env,
                 capture_output=True,
@@ -119,6 +202,7 @@ def run_model_monitoring(config_path, mlflow_enabled, thresh, drift_thresh):
                 str(thresh),
                 "--drift_threshold",
                 str(drift_thresh),
+                *extra_args,
             ],
             capture_output=True,
             text=True,
@@ -134,6 +218,152 @@ def run_model_monitoring(config_path, mlflow_enabled, thresh, drift_thresh):
             logging.warning("Model monitoring failed!")
 
 
+def run_cached(cache, stage, stage_fingerprint, outputs, run_fn):
+    if cache.is_fresh(stage, stage_fingerprint):
+        logging.info(f"Skipping {stage}: inputs unchanged, reusing {outputs}")
+        return
+    run_fn()
+    cache.record(stage, stage_fingerprint, outputs)
+
+
+def train_outputs(config, model_type):
+    # Every training run also writes the imputer, the timing report and the
+    # spatial index; a missing one means the model has to be retrained
+    outputs = [
+        config[model_type],
+        config["imputer_path"],
+        config["training_report_path"],
+    ]
+    if config.get("spatial_features", {}).get("enabled"):
+        outputs.append(config["spatial_features"]["index_path"])
+    if model_type == "linear_regression":
+        outputs.append(config["refresh"]["linear_stats_path"])
+    return outputs
+
+
+def run_pipeline(
+    config_path, mlflow_enabled, thresh, drift_thresh, force=False, extra_args=()
+):
+    with open(config_path) as f:
+        config = yaml.safe_load(f)
+    cache = StageCache(config["stage_manifest_path"], force=force)
+
+    # Inputs shared by every stage that loads and prepares the data
+    data_file = os.path.join(config["raw_data_path"], config["raw_data_file"])
+    prep_keys = [
+        "raw_data_path",
+        "raw_data_file",
+        "splits",
+        "test_size",
+        "target",
+        "features",
+        "spatial_features",
+    ]
+    prep_code = [
+        "src/housing/data_preparation.py",
+        "src/housing/feature_spec.py",
+        "src/housing/spatial_features.py",
+    ]
+
+    run_cached(
+        cache,
+        "ingest",
+        fingerprint(
+            config=config,
+            keys=["download_url", "raw_data_path", "raw_data_file"],
+            code=["scripts/ingest.py", "src/housing/data_ingestion.py"],
+        ),
+        [data_file],
+        lambda: run_data_preparation(config_path, mlflow_enabled, extra_args),
+    )
+
+    # Each model has its own fingerprint so only changed models are retrained
+    train_code = prep_code + ["scripts/train.py", "src/housing/model_training.py"]
+    train_keys = prep_keys + ["imputer_path", "training_report_path"]
+    model_fingerprints = {
+        model_type: fingerprint(
+            files=[data_file],
+            config=config,
+            keys=train_keys + [model_type],
+            code=train_code,
+        )
+        for model_type in config["models"]
+    }
+    stale_models = [
+        model_type
+        for model_type, model_fingerprint in model_fingerprints.items()
+        if not cache.is_fresh(f"train:{model_type}", model_fingerprint)
+    ]
+    if stale_models:
+        run_model_training(
+            config_path, mlflow_enabled, models=stale_models, extra_args=extra_args
+        )
+        for model_type in stale_models:
+            cache.record(
+                f"train:{model_type}",
+                model_fingerprints[model_type],
+                train_outputs(config, model_type),
+            )
+    else:
+        logging.info("Skipping training: all models are up to date")
+
+    teacher_path = config[config["distillation"]["teacher"]]
+    run_cached(
+        cache,
+        "distill",
+        fingerprint(
+            files=[data_file, teacher_path],
+            config=config,
+            keys=prep_keys + ["distillation", "distilled_model"],
+            code=prep_code
+            + ["scripts/distill.py", "src/housing/model_distillation.py"],
+        ),
+        [config["distilled_model"]],
+        lambda: run_model_distillation(config_path, mlflow_enabled, extra_args),
+    )
+
+    model_paths = [config[model_type] for model_type in config["models"]]
+    run_cached(
+        cache,
+        "score",
+        fingerprint(
+            files=[data_file, *model_paths, config["training_report_path"]],
+            config=config,
+            keys=prep_keys
+            + ["models", "model_comparison_path", "training_report_path"],
+            code=prep_code + ["scripts/score.py", "src/housing/model_scoring.py"],
+        ),
+        [config["model_comparison_path"]],
+        lambda: run_model_scoring(config_path, mlflow_enabled, extra_args),
+    )
+
+    final_model = config["final_model"]
+    report_dir = config["model_monitoring_path"]
+    monitor_config = {**config, "threshold": thresh, "drift_threshold": drift_thresh}
+    run_cached(
+        cache,
+        "monitor",
+        fingerprint(
+            files=[data_file, config[final_model]],
+            config=monitor_config,
+            keys=prep_keys
+            + ["final_model", "model_monitoring_path", "threshold", "drift_threshold"],
+            code=prep_code + ["scripts/monitor.py", "src/housing/model_monitoring.py"],
+        ),
+        [
+            os.path.join(report_dir, f"{final_model}_data_drift_report.json"),
+            os.path.join(report_dir, f"{final_model}_performance_report.json"),
+        ],
+        lambda: run_model_monitoring(
+            config_path,
+            mlflow_enabled,
+            thresh=thresh,
+            drift_thresh=drift_thresh,
+            extra_args=extra_args,
+        ),
+    )
+
+
 def main():
     parser = argparse.ArgumentParser(description="End-to-End ML Pipeline")
     parser.add_argument(
@@ -146,12 +376,21 @@ def main():
     )
     parser.add_argument("--threshold", type=float, default=0.75)
     parser.add_argument("--drift_threshold", type=float, default=0.2)
+    parser.add_argument(
+        "--force", action="store_true", help="Rerun every stage ignoring the manifest"
+    )
+    add_logging_arguments(parser)
+    add_profiling_arguments(parser)
     args = parser.parse_args()
 
+    configure_logging_from_args(args)
+
     config_path = args.config
     mlflow_enabled = args.mlflow
     thresh = args.threshold
     drift_thresh = args.drift_threshold
+    # Each stage subprocess writes its own profile next to the pipeline's
+    extra_args = profiling_passthrough_args(args)
 
     # Start the parent MLflow run if enabled
     if mlflow_enabled:
@@ -162,25 +401,31 @@ def main():
                 f"Running ML pipeline with parent run ID: {parent_run.info.run_id}"
             )
 
-            # Run the child tasks: data preparation, model training, and model scoring
-            run_data_preparation(config_path, mlflow_enabled)
-            run_model_training(config_path, mlflow_enabled)
-            run_model_scoring(config_path, mlflow_enabled)
-            run_model_monitoring(
-                config_path, mlflow_enabled, thresh=thresh, drift_thresh=drift_thresh
-            )
+            # Run the child tasks, skipping those whose inputs are unchanged
+            with profile_from_args(args, "pipeline"):
+                run_pipeline(
+                    config_path,
+                    mlflow_enabled,
+                    thresh,
+                    drift_thresh,
+                    force=args.force,
+                    extra_args=extra_args,
+                )
 
             logging.info(
                 f"End-to-end ML pipeline completed-parent run ID: {parent_run.info.run_id}"
             )
     else:
         logging.info("Running ML pipeline without MLflow tracking.")
-        run_data_preparation(config_path, mlflow_enabled)
-        run_model_training(config_path, mlflow_enabled)
-        run_model_scoring(config_path, mlflow_enabled)
-        run_model_monitoring(
-            config_path, mlflow_enabled, thresh=thresh, drift_thresh=drift_thresh
-        )
+        with profile_from_args(args, "pipeline"):
+            run_pipeline(
+                config_path,
+                mlflow_enabled,
+                thresh,
+                drift_thresh,
+                force=args.force,
+                extra_args=extra_args,
+            )
 
 
 if __name__ == "__main__":
@@ -2,20 +2,31 @@ import argparse
 import logging
 import os
 import sys
+import uuid
+from datetime import datetime, timezone
 
 import joblib
 import mlflow
 import mlflow.sklearn
+import numpy as np
 import yaml
 
 from housing.data_ingestion import fetch_data
 from housing.data_preparation import load_data, prepare_data, stratified_split
-from housing.logging_utils import configure_logging
+from housing.logging_utils import add_logging_arguments, configure_logging_from_args
 from housing.model_monitoring import (
     check_data_drift,
-    check_model_performance,
+    check_performance,
     generate_evidently_reports,
+    sketch_drift,
+    summarize_reports,
 )
+from housing.monitoring_history import MonitoringHistory
+from housing.prediction_cache import artifact_version
+from housing.profiling import add_profiling_arguments, profile_from_args
+from housing.spatial_features import apply_spatial_features
+from housing.streaming_metrics import RegressionAccumulator
+from housing.tracking import MlflowTracker
 
 
 def main():
@@ -23,114 +34,140 @@ def main():
     parser.add_argument(
         "--config", default="config/config.yaml", help="Path to config YAML"
     )
-    parser.add_argument(
-        "--log-level", default="INFO", help="Logging level (e.g. DEBUG, INFO)"
-    )
-    parser.add_argument("--log-path", help="Optional log file path")
-    parser.add_argument(
-        "--no-console-log", action="store_true", help="Suppress console logging"
-    )
+    add_logging_arguments(parser)
+    add_profiling_arguments(parser)
     parser.add_argument("--mlflow", action="store_true", help="Enable MLflow tracking")
     parser.add_argument("--threshold", type=float, default=0.5)
     parser.add_argument("--drift_threshold", type=float, default=0.2)
     args = parser.parse_args()
 
     # Configure logging
-    configure_logging(
-        log_level=args.log_level,
-        log_path=args.log_path,
-        console_log=not args.no_console_log,
-    )
+    configure_logging_from_args(args)
 
-    # Start MLflow run if enabled
-    if args.mlflow:
-        run_id = os.environ.get("MLFLOW_RUN_ID")
-        if run_id:
-            mlflow.start_run(run_id=run_id)
-        else:
-            mlflow.set_experiment("Housing Experiment")
-            mlflow.start_run(run_name="Final Model Monitoring", nested=True)
-        logging.info("MLflow tracking started for scoring.")
-
-    with open(args.config) as f:
-        config = yaml.safe_load(f)
-
-    # Get the data
-    fetch_data(args.config)
-    # Load the data
-    df = load_data(args.config)
-    # Train test split
-    train_set, test_set = stratified_split(
-        df, splits=config["splits"], testsize=config["test_size"]
-    )
-    # Get data to predict
-    X_train, _ = prepare_data(train_set.drop(columns=[config["target"]], axis=1))
-    X_test, _ = prepare_data(test_set.drop(columns=[config["target"]], axis=1))
-
-    logging.info("Starting model monitoring...")
-
-    # Getting the final model name from config
-    model_type = config["final_model"]
-    # Model path from confi
-    model_path = config[model_type]
-    if not os.path.exists(model_path):
-        # Separate the path
-        parts = config[model_type].split(os.sep)
-        # Removing model folder
-        filtered_parts = [part for part in parts if part != "model"]
-        # Creating the new path
-        model_path = os.sep.join(filtered_parts)
-    
-    # Loading the model
-    model = joblib.load(model_path)
-
-    # Make predictions
-    train_set["prediction"] = model.predict(X_train)
-    test_set["prediction"] = model.predict(X_test)
-
-    # Monitoring function
-    report_paths = generate_evidently_reports(
-        train=train_set,
-        test=test_set,
-        output_dir=config["model_monitoring_path"],
-        target_col=config["target"],
-        model_type=model_type,
-    )
-
-    # Check Drift
-    drift_ratio, drift_ok = check_data_drift(
-        report_paths["data_drift"], drift_ratio_threshold=args.drift_threshold
-    )
-
-    # Check Performance
-    r2, perf_ok = check_model_performance(
-        report_paths["performance"], threshold=args.threshold
-    )
-
-    if not (drift_ok and perf_ok):
-        logging.info(f"One or more checks failed for {model_type}.")
+    with profile_from_args(args, "monitor"):
+        # Start MLflow run if enabled
         if args.mlflow:
-            with mlflow.start_run(run_name=model_type, nested=True):
-                mlflow.log_metric("Drift Ratio", drift_ratio)
-                mlflow.log_metric("Drift Threshold", args.drift_threshold)
-                mlflow.log_metric("Drift Pass", drift_ok)
-                mlflow.log_metric("R2", r2)
-                mlflow.log_metric("Performance Threshold", args.threshold)
-                mlflow.log_metric("Performance Pass", perf_ok)
-                mlflow.log_metric("All Checked Passed", False)
-        sys.exit(1)
-    else:
-        logging.info(f"All checks passed {model_type}")
+            run_id = os.environ.get("MLFLOW_RUN_ID")
+            if run_id:
+                mlflow.start_run(run_id=run_id)
+            else:
+                mlflow.set_experiment("Housing Experiment")
+                mlflow.start_run(run_name="Final Model Monitoring", nested=True)
+            tracker = MlflowTracker.from_active_run()
+            logging.info("MLflow tracking started for scoring.")
+
+        with open(args.config) as f:
+            config = yaml.safe_load(f)
+
+        # Get the data
+        fetch_data(args.config)
+        # Load the data
+        df = load_data(args.config)
+        # Train test split
+        train_set, test_set = stratified_split(
+            df, splits=config["splits"], testsize=config["test_size"]
+        )
+        # Get data to predict
+        X_train, _ = prepare_data(
+            train_set.drop(columns=[config["target"]], axis=1),
+            feature_spec=config["features"],
+        )
+        X_test, _ = prepare_data(
+            test_set.drop(columns=[config["target"]], axis=1),
+            feature_spec=config["features"],
+        )
+        X_train = apply_spatial_features(X_train, train_set, config, leave_one_out=True)
+        X_test = apply_spatial_features(X_test, test_set, config)
+
+        logging.info("Starting model monitoring...")
+
+        # Getting the final model name from config
+        model_type = config["final_model"]
+        # Model path from confi
+        model_path = config[model_type]
+        if not os.path.exists(model_path):
+            # Separate the path
+            parts = config[model_type].split(os.sep)
+            # Removing model folder
+            filtered_parts = [part for part in parts if part != "model"]
+            # Creating the new path
+            model_path = os.sep.join(filtered_parts)
+
+        # Loading the model
+        model = joblib.load(model_path)
+
+        # Make predictions
+        train_set["prediction"] = model.predict(X_train)
+        test_set["prediction"] = model.predict(X_test)
+
+        # Monitoring function
+        report_paths = generate_evidently_reports(
+            train=train_set,
+            test=test_set,
+            output_dir=config["model_monitoring_path"],
+            target_col=config["target"],
+            model_type=model_type,
+        )
+
+        # Check Drift
+        drift_ratio, drift_ok = check_data_drift(
+            report_paths["data_drift"], drift_ratio_threshold=args.drift_threshold
+        )
+
+        # Check Performance from the accumulated metrics rather than the report
+        performance = RegressionAccumulator().update(
+            test_set[config["target"]], test_set["prediction"]
+        )
+        r2, perf_ok = check_performance(performance, threshold=args.threshold)
+
+        # Sketch-based PSI per raw numeric feature, alongside Evidently's tests
+        psi = sketch_drift(train_set, test_set, config["features"]["numeric"])
+        psi_path = os.path.join(
+            config["model_monitoring_path"], f"{model_type}_psi.csv"
+        )
+        psi.to_csv(psi_path)
+        logging.info(f"Population stability index:\n{psi.to_string()}")
+
+        # Append this run to the columnar history used for trend queries
+        summary, column_drift = summarize_reports(report_paths)
+        summary.update(performance.summary())
+        summary.update(
+            {
+                "run_id": uuid.uuid4().hex,
+                "timestamp": np.datetime64(
+                    datetime.now(timezone.utc).replace(tzinfo=None), "s"
+                ),
+                "model_type": model_type,
+                "model_version": artifact_version(model_path),
+                "drift_ok": drift_ok,
+                "perf_ok": perf_ok,
+            }
+        )
+        MonitoringHistory(config["monitoring_history_path"]).append_run(
+            summary, column_drift
+        )
+
         if args.mlflow:
-            with mlflow.start_run(run_name=model_type, nested=True):
-                mlflow.log_metric("Drift Ratio", drift_ratio)
-                mlflow.log_metric("Drift Threshold", args.drift_threshold)
-                mlflow.log_metric("Drift Pass", drift_ok)
-                mlflow.log_metric("R2", r2)
-                mlflow.log_metric("Performance Threshold", args.threshold)
-                mlflow.log_metric("Performance Pass", perf_ok)
-                mlflow.log_metric("All Checked Passed", True)
-        sys.exit(0)
+            tracker.log_param("Model Type", model_type)
+            tracker.log_metrics(
+                {
+                    "Drift Ratio": drift_ratio,
+                    "Drift Threshold": args.drift_threshold,
+                    "Drift Pass": drift_ok,
+                    "R2": r2,
+                    "Performance Threshold": args.threshold,
+                    "Performance Pass": perf_ok,
+                    "All Checked Passed": drift_ok and perf_ok,
+                }
+            )
+            tracker.close()
+
+        if not (drift_ok and perf_ok):
+            logging.info(f"One or more checks failed for {model_type}.")
+            sys.exit(1)
+        else:
+            logging.info(f"All checks passed {model_type}")
+            sys.exit(0)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,226 @@
+import argparse
+import copy
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import pandas as pd
+import yaml
+from sklearn.metrics import mean_squared_error
+
+from housing.data_preparation import load_data, prepare_data, stratified_split
+from housing.logging_utils import add_logging_arguments, configure_logging_from_args
+from housing.model_refresh import (
+    REFRESHABLE_MODELS,
+    LinearSufficientStats,
+    applied_partitions,
+    partition_fingerprint,
+    record_lineage,
+    refresh_forest,
+)
+from housing.model_training import train_model
+from housing.prediction_cache import artifact_version
+from housing.profiling import add_profiling_arguments, profile_from_args
+from housing.spatial_features import apply_spatial_features
+
+
+def prepare_partition(partition, config, imputer):
+    # New rows use the training medians so features line up with the models
+    X, _ = prepare_data(
+        partition.drop(config["target"], axis=1),
+        feature_spec=config["features"],
+        imputer=imputer,
+    )
+    X = apply_spatial_features(X, partition, config)
+    return X, partition[config["target"]]
+
+
+def load_linear_stats(config, config_path):
+    stats_path = config["refresh"]["linear_stats_path"]
+    if os.path.exists(stats_path):
+        return LinearSufficientStats.load(stats_path)
+    # One-off pass over the training split for models trained before stats
+    # were stored; later refreshes only touch the new partition
+    logging.warning(f"No linear statistics at {stats_path}, rebuilding them")
+    df = load_data(config_path)
+    train_set, _ = stratified_split(
+        df, splits=config["splits"], testsize=config["test_size"]
+    )
+    imputer = joblib.load(config["imputer_path"])
+    X_train, y_train = prepare_partition(train_set, config, imputer)
+    return LinearSufficientStats.from_data(X_train, y_train)
+
+
+def refresh_model(model_type, X_new, y_new, config, args):
+    model_path = config[model_type]
+    model = joblib.load(model_path)
+    entry = {
+        "model_type": model_type,
+        "model_path": model_path,
+        "previous_version": artifact_version(model_path),
+    }
+    start = time.perf_counter()
+    if model_type == "linear_regression":
+        stats = load_linear_stats(config, args.config).update(X_new, y_new)
+        model = stats.to_model()
+        stats.save(config["refresh"]["linear_stats_path"])
+        entry["rows_seen"] = stats.n
+    else:
+        entry["previous_trees"] = len(model.estimators_)
+        model, entry["pruned_trees"] = refresh_forest(
+            model, X_new, y_new, n_new_trees=args.new_trees, max_trees=args.max_trees
+        )
+        entry["trees"] = len(model.estimators_)
+    entry["refresh_time_s"] = time.perf_counter() - start
+
+    joblib.dump(model, model_path)
+    entry["version"] = artifact_version(model_path)
+    logging.info(
+        f"{model_type} refreshed in {entry['refresh_time_s']:.2f}s, "
+        f"saved at: {model_path}"
+    )
+    return model, entry
+
+
+def compare_with_full_retrain(refreshed, partition, config, config_path):
+    """Test RMSE and time of each refreshed model against a full retrain."""
+    df = load_data(config_path)
+    train_set, test_set = stratified_split(
+        df, splits=config["splits"], testsize=config["test_size"]
+    )
+    full_set = pd.concat([train_set, partition], ignore_index=True)
+
+    # The full retrain builds its own spatial index, kept out of the artifacts
+    full_config = copy.deepcopy(config)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        full_config["spatial_features"]["index_path"] = os.path.join(
+            tmp_dir, "spatial_index.pkl"
+        )
+        X_full, full_imputer = prepare_data(
+            full_set.drop(config["target"], axis=1), feature_spec=config["features"]
+        )
+        y_full = full_set[config["target"]]
+        X_full = apply_spatial_features(X_full, full_set, full_config, target=y_full)
+        X_test_full, _ = prepare_partition(test_set, full_config, full_imputer)
+
+        X_test, y_test = prepare_partition(
+            test_set, config, joblib.load(config["imputer_path"])
+        )
+        rows = []
+        for model_type, (model, entry) in refreshed.items():
+            start = time.perf_counter()
+            full_model, _, _ = train_model(X_full, y_full, model_type)
+            full_time = time.perf_counter() - start
+            rows.append(
+                {
+                    "model_type": model_type,
+                    "refresh_time_s": entry["refresh_time_s"],
+                    "full_retrain_time_s": full_time,
+                    "refresh_rmse": np.sqrt(
+                        mean_squared_error(y_test, model.predict(X_test))
+                    ),
+                    "full_retrain_rmse": np.sqrt(
+                        mean_squared_error(y_test, full_model.predict(X_test_full))
+                    ),
+                }
+            )
+    return pd.DataFrame(rows).set_index("model_type")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh Models With New Data")
+    parser.add_argument(
+        "--config", default="config/config.yaml", help="Path to config YAML"
+    )
+    parser.add_argument(
+        "--partition", required=True, help="CSV of new districts since last refresh"
+    )
+    parser.add_argument(
+        "--models", nargs="+", help="Model types to refresh (default: all refreshable)"
+    )
+    parser.add_argument("--new-trees", type=int, help="Trees added per forest")
+    parser.add_argument("--max-trees", type=int, help="Drop the oldest trees above")
+    parser.add_argument(
+        "--compare", action="store_true", help="Also time and score a full retrain"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Apply the partition even if the lineage shows it was applied before",
+    )
+    add_logging_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+
+    configure_logging_from_args(args)
+
+    with profile_from_args(args, "refresh"):
+        with open(args.config) as f:
+            config = yaml.safe_load(f)
+        refresh_config = config["refresh"]
+        if args.new_trees is None:
+            args.new_trees = refresh_config["new_trees"]
+        if args.max_trees is None:
+            args.max_trees = refresh_config.get("max_trees")
+
+        models = args.models or [
+            model_type
+            for model_type in config["models"]
+            if model_type in REFRESHABLE_MODELS
+        ]
+        skipped = [m for m in models if m not in REFRESHABLE_MODELS]
+        if skipped:
+            logging.warning(
+                f"{skipped} cannot be refreshed incrementally and are left as is"
+            )
+
+        logging.info(f"Loading partition {args.partition}...")
+        partition = pd.read_csv(args.partition)
+        imputer = joblib.load(config["imputer_path"])
+        X_new, y_new = prepare_partition(partition, config, imputer)
+
+        refreshed = {}
+        run_time = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        fingerprint = partition_fingerprint(args.partition)
+        for model_type in models:
+            if model_type in skipped:
+                continue
+            # Applying a partition twice would count its rows twice in the
+            # linear statistics and add duplicate trees to the forests
+            applied = applied_partitions(refresh_config["lineage_path"], model_type)
+            if fingerprint in applied and not args.force:
+                logging.warning(
+                    f"{args.partition} was already applied to {model_type}, "
+                    "skipping (use --force to apply it again)"
+                )
+                continue
+            model, entry = refresh_model(model_type, X_new, y_new, config, args)
+            entry.update(
+                {
+                    "timestamp": run_time,
+                    "partition": os.path.abspath(args.partition),
+                    "partition_fingerprint": fingerprint,
+                    "partition_rows": len(partition),
+                }
+            )
+            record_lineage(refresh_config["lineage_path"], entry)
+            refreshed[model_type] = (model, entry)
+        logging.info(f"Lineage recorded at: {refresh_config['lineage_path']}")
+
+        if args.compare and refreshed:
+            logging.info("Comparing against a full retrain...")
+            comparison = compare_with_full_retrain(
+                refreshed, partition, config, args.config
+            )
+            logging.info(f"Refresh vs full retrain:\n{comparison.to_string()}")
+            comparison_path = refresh_config["comparison_path"]
+            os.makedirs(os.path.dirname(comparison_path), exist_ok=True)
+            comparison.to_csv(comparison_path)
+
+
+if __name__ == "__main__":
+    main()
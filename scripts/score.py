@@ -4,11 +4,15 @@ import os
 
 import mlflow
 import mlflow.sklearn
+import pandas as pd
 import yaml
 
 from housing.data_preparation import load_data, prepare_data, stratified_split
-from housing.logging_utils import configure_logging
-from housing.model_scoring import evaluate_model
+from housing.logging_utils import add_logging_arguments, configure_logging_from_args
+from housing.model_scoring import SCORE_CHUNK_ROWS, score_models
+from housing.profiling import add_profiling_arguments, profile_from_args
+from housing.spatial_features import apply_spatial_features
+from housing.tracking import MlflowTracker
 
 
 def main():
@@ -16,76 +20,98 @@ def main():
     parser.add_argument(
         "--config", default="config/config.yaml", help="Path to config YAML"
     )
+    add_logging_arguments(parser)
+    add_profiling_arguments(parser)
+    parser.add_argument("--mlflow", action="store_true", help="Enable MLflow tracking")
     parser.add_argument(
-        "--log-level", default="INFO", help="Logging level (e.g. DEBUG, INFO)"
+        "--n-jobs", type=int, help="Models scored in parallel (default: one per model)"
     )
-    parser.add_argument("--log-path", help="Optional log file path")
     parser.add_argument(
-        "--no-console-log", action="store_true", help="Suppress console logging"
+        "--chunk-rows",
+        type=int,
+        default=SCORE_CHUNK_ROWS,
+        help="Test rows predicted at a time while accumulating metrics",
     )
-    parser.add_argument("--mlflow", action="store_true", help="Enable MLflow tracking")
     args = parser.parse_args()
 
     # Configure logging
-    configure_logging(
-        log_level=args.log_level,
-        log_path=args.log_path,
-        console_log=not args.no_console_log,
-    )
+    configure_logging_from_args(args)
 
-    # Start MLflow run if enabled
-    if args.mlflow:
-        run_id = os.environ.get("MLFLOW_RUN_ID")
-        if run_id:
-            mlflow.start_run(run_id=run_id)
-        else:
-            mlflow.set_experiment("Housing Experiment")
-            mlflow.start_run(run_name="Model Scoring", nested=True)
-        logging.info("MLflow tracking started for scoring.")
-
-    with open(args.config) as f:
-        config = yaml.safe_load(f)
-
-    logging.info("Getting & Processing the test data...")
-    df = load_data(args.config)
-    _, test_set = stratified_split(
-        df, splits=config["splits"], testsize=config["test_size"]
-    )
-    y_test = test_set["median_house_value"]
-    X_test, _ = prepare_data(test_set.drop("median_house_value", axis=1))
-    logging.info("Processing complete.")
-
-    # Log parameters to MLflow if enabled
-    if args.mlflow:
-        mlflow.log_param("num_test_samples", len(y_test))
-
-    logging.info("Starting model scoring...")
-
-    for model_type in [
-        "linear_regression",
-        "decision_tree",
-        "random_forest_random_search",
-        "random_forest_grid_search",
-    ]:
-        # Model path
-        m_path = config[model_type]
-        # Scoring function
-        _, rmse, mae = evaluate_model(m_path, X_test, y_test)
-        logging.info(
-            f"{model_type} Model scoring completed with Test RMSE:{rmse} & MAE:{mae}"
+    with profile_from_args(args, "score"):
+        # Start MLflow run if enabled
+        if args.mlflow:
+            run_id = os.environ.get("MLFLOW_RUN_ID")
+            if run_id:
+                mlflow.start_run(run_id=run_id)
+            else:
+                mlflow.set_experiment("Housing Experiment")
+                mlflow.start_run(run_name="Model Scoring", nested=True)
+            tracker = MlflowTracker.from_active_run()
+            logging.info("MLflow tracking started for scoring.")
+
+        with open(args.config) as f:
+            config = yaml.safe_load(f)
+
+        logging.info("Getting & Processing the test data...")
+        df = load_data(args.config)
+        _, test_set = stratified_split(
+            df, splits=config["splits"], testsize=config["test_size"]
+        )
+        y_test = test_set["median_house_value"]
+        X_test, _ = prepare_data(
+            test_set.drop("median_house_value", axis=1), feature_spec=config["features"]
         )
-        # Log metrics to MLflow if enabled
+        X_test = apply_spatial_features(X_test, test_set, config)
+        logging.info("Processing complete.")
+
+        # Log parameters to MLflow if enabled
         if args.mlflow:
-            with mlflow.start_run(run_name=model_type, nested=True):
-                mlflow.log_metric("Test RMSE", rmse)
-                mlflow.log_metric("Test MAE", mae)
+            tracker.log_param("num_test_samples", len(y_test))
+
+        logging.info("Starting model scoring...")
+
+        # Every registered model is scored concurrently on the same test matrix
+        model_paths = {
+            model_type: config[model_type] for model_type in config["models"]
+        }
+        comparison = score_models(
+            model_paths, X_test, y_test, n_jobs=args.n_jobs, chunk_rows=args.chunk_rows
+        )
+        if os.path.exists(config["training_report_path"]):
+            train_times = pd.read_csv(
+                config["training_report_path"], index_col="model_type"
+            )
+            comparison = comparison.join(train_times["train_time_s"])
 
-    logging.info("Model scoring complete.")
+        for model_type, row in comparison.iterrows():
+            logging.info(
+                f"{model_type} Model scoring completed with Test RMSE:{row['rmse']} "
+                f"& MAE:{row['mae']}"
+            )
+            # Log metrics to MLflow if enabled
+            if args.mlflow:
+                tracker.log_metrics(
+                    {
+                        f"{model_type} Test RMSE": row["rmse"],
+                        f"{model_type} Test MAE": row["mae"],
+                        f"{model_type} Test R2": row["r2"],
+                        f"{model_type} Test Bias": row["bias"],
+                    }
+                )
 
-    # End MLflow run if it was started
-    if args.mlflow:
-        mlflow.end_run()
-        logging.info("MLflow run ended for scoring.")
+        logging.info(f"Model comparison:\n{comparison.to_string()}")
+        comparison_path = config["model_comparison_path"]
+        os.makedirs(os.path.dirname(comparison_path), exist_ok=True)
+        comparison.to_csv(comparison_path)
+        logging.info(f"Model comparison saved at: {comparison_path}")
+
+        logging.info("Model scoring complete.")
+
+        # End MLflow run if it was started
+        if args.mlflow:
+            tracker.close()
+            mlflow.end_run()
+            logging.info("MLflow run ended for scoring.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,47 @@
+import argparse
+import logging
+import os
+
+import yaml
+
+from housing.logging_utils import add_logging_arguments, configure_logging_from_args
+from housing.serving import ModelPredictor, PreforkServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Housing Model")
+    parser.add_argument(
+        "--config", default="config/config.yaml", help="Path to config YAML"
+    )
+    parser.add_argument("--model", help="Path to model (default: final_model)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--workers", type=int, help="Worker processes (default: one per CPU)"
+    )
+    add_logging_arguments(parser)
+    args = parser.parse_args()
+
+    # Workers are forked, so records are written directly rather than
+    # through a listener thread that would not exist in the children
+    args.log_queue = False
+    configure_logging_from_args(args)
+
+    with open(args.config) as f:
+        config = yaml.safe_load(f)
+
+    model_path = args.model or config[config["final_model"]]
+    imputer_path = config.get("imputer_path")
+    if imputer_path and not os.path.exists(imputer_path):
+        logging.warning(
+            f"No fitted imputer at {imputer_path}, medians come from each request"
+        )
+        imputer_path = None
+
+    predictor = ModelPredictor(model_path, config, imputer_path=imputer_path)
+    server = PreforkServer(predictor, args.host, args.port, workers=args.workers)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,113 +1,152 @@
 import argparse
 import logging
 import os
+import time
 
 import joblib
 import mlflow
 import mlflow.sklearn
+import numpy as np
+import pandas as pd
 import yaml
 
 from housing.data_preparation import load_data, prepare_data, stratified_split
-from housing.logging_utils import configure_logging
+from housing.feature_spec import compile_feature_spec
+from housing.logging_utils import add_logging_arguments, configure_logging_from_args
+from housing.model_refresh import LinearSufficientStats
 from housing.model_training import train_model
+from housing.profiling import add_profiling_arguments, profile_from_args
+from housing.spatial_features import apply_spatial_features
+from housing.tracking import MlflowTracker
 
 mlflow.set_tracking_uri("file://" + os.path.abspath("mlruns"))
 
+# Rows per chunk when the approximate median imputer is fitted in one pass
+IMPUTER_CHUNK_ROWS = 100_000
+
+
+def fit_imputer(train_set, feature_spec):
+    # The sketch imputer is fitted chunk by chunk, as it would be from
+    # pd.read_csv(..., chunksize=...); the exact imputer is fitted in prepare_data
+    transform = compile_feature_spec(feature_spec)
+    if transform.imputer_strategy != "approximate_median":
+        return None
+    n_chunks = -(-len(train_set) // IMPUTER_CHUNK_ROWS)
+    rows = np.array_split(np.arange(len(train_set)), n_chunks)
+    return transform.fit_imputer(train_set.iloc[chunk] for chunk in rows)
+
 
 def main():
     parser = argparse.ArgumentParser(description="Train Housing Model")
     parser.add_argument(
         "--config", default="config/config.yaml", help="Path to config YAML"
     )
+    add_logging_arguments(parser)
+    add_profiling_arguments(parser)
+    parser.add_argument("--mlflow", action="store_true", help="Enable MLflow tracking")
     parser.add_argument(
-        "--log-level", default="INFO", help="Logging level (e.g. DEBUG, INFO)"
-    )
-    parser.add_argument("--log-path", help="Optional log file path")
-    parser.add_argument(
-        "--no-console-log", action="store_true", help="Suppress console logging"
+        "--models", nargs="+", help="Model types to train (default: all in config)"
     )
-    parser.add_argument("--mlflow", action="store_true", help="Enable MLflow tracking")
     args = parser.parse_args()
 
     # Configure logging
-    configure_logging(
-        log_level=args.log_level,
-        log_path=args.log_path,
-        console_log=not args.no_console_log,
-    )
+    configure_logging_from_args(args)
+
+    with profile_from_args(args, "train"):
+        # Start MLflow run if enabled
+        if args.mlflow:
+            run_id = os.environ.get("MLFLOW_RUN_ID")
+            if run_id:
+                mlflow.start_run(run_id=run_id)
+            else:
+                mlflow.set_experiment("Housing Experiment")
+                mlflow.start_run(run_name="Training", nested=True)
+            tracker = MlflowTracker.from_active_run()
+            logging.info("MLflow tracking started.")
 
-    # Start MLflow run if enabled
-    if args.mlflow:
-        run_id = os.environ.get("MLFLOW_RUN_ID")
-        if run_id:
-            mlflow.start_run(run_id=run_id)
-        else:
-            mlflow.set_experiment("Housing Experiment")
-            mlflow.start_run(run_name="Training", nested=True)
-        logging.info("MLflow tracking started.")
+        logging.info("Starting data preparation...")
+        df = load_data(args.config)
 
-    logging.info("Starting data preparation...")
-    df = load_data(args.config)
+        with open(args.config) as f:
+            config = yaml.safe_load(f)
 
-    with open(args.config) as f:
-        config = yaml.safe_load(f)
+        train_set, _ = stratified_split(
+            df, splits=config["splits"], testsize=config["test_size"]
+        )
+        X_train, imputer = prepare_data(
+            train_set.drop("median_house_value", axis=1),
+            feature_spec=config["features"],
+            imputer=fit_imputer(train_set, config["features"]),
+        )
+        y_train = train_set["median_house_value"]
+        # Training medians are reused when serving single rows
+        os.makedirs(os.path.dirname(config["imputer_path"]), exist_ok=True)
+        joblib.dump(imputer, config["imputer_path"])
+        # Builds and saves the neighbour index when spatial features are enabled
+        X_train = apply_spatial_features(X_train, train_set, config, target=y_train)
 
-    train_set, _ = stratified_split(
-        df, splits=config["splits"], testsize=config["test_size"]
-    )
-    X_train, imputer = prepare_data(train_set.drop("median_house_value", axis=1))
-    y_train = train_set["median_house_value"]
-
-    # Log parameters to MLflow if enabled
-    if args.mlflow:
-        mlflow.log_param("config", args.config)
-        mlflow.log_param("num_features", X_train.shape[1])
-        mlflow.log_param("Stratified Split", config["splits"])
-        mlflow.log_param("Test Size", config["test_size"])
-        mlflow.sklearn.log_model(imputer, artifact_path="imputer")
-
-    logging.info("Starting model training...")
-    for model_type in [
-        "linear_regression",
-        "decision_tree",
-        "random_forest_random_search",
-        "random_forest_grid_search",
-    ]:
-        logging.info(f"Starting {model_type}...")
-        # Calling the function
-        model, rmse, mae = train_model(X_train, y_train, model_type)
-        logging.info(f"{model_type} Metrics - RMSE: {rmse} & MAE: {mae}")
-        # Dumping model
-        model_path = config[model_type]
-        # Model dump directory
-        model_dir = os.path.dirname(model_path)
-        # Create directory if does not exists
-        os.makedirs(model_dir, exist_ok=True)
-        # Dump model
-        joblib.dump(model, model_path)
-        logging.info(f"{model_type} Model Pickle saved at: {model_path}")
-        # Log model metrics to MLflow if enabled
+        # Log parameters to MLflow if enabled
         if args.mlflow:
-            with mlflow.start_run(run_name=model_type, nested=True):
-                mlflow.sklearn.log_model(
-                    sk_model=model,
-                    artifact_path=model_type,
-                    input_example=X_train.iloc[:5],
-                    signature=mlflow.models.infer_signature(
-                        X_train, model.predict(X_train)
-                    ),
+            tracker.log_params(
+                {
+                    "config": args.config,
+                    "num_features": X_train.shape[1],
+                    "Stratified Split": config["splits"],
+                    "Test Size": config["test_size"],
+                }
+            )
+            tracker.log_model_async(imputer, "imputer", X_train)
+
+        logging.info("Starting model training...")
+        train_times = {}
+        for model_type in args.models or config["models"]:
+            logging.info(f"Starting {model_type}...")
+            # Calling the function
+            start = time.perf_counter()
+            model, rmse, mae = train_model(X_train, y_train, model_type)
+            train_times[model_type] = time.perf_counter() - start
+            logging.info(
+                f"{model_type} Metrics - RMSE: {rmse} & MAE: {mae} "
+                f"(trained in {train_times[model_type]:.2f}s)"
+            )
+            # Dumping model
+            model_path = config[model_type]
+            # Model dump directory
+            model_dir = os.path.dirname(model_path)
+            # Create directory if does not exists
+            os.makedirs(model_dir, exist_ok=True)
+            # Dump model
+            joblib.dump(model, model_path)
+            logging.info(f"{model_type} Model Pickle saved at: {model_path}")
+            if model_type == "linear_regression":
+                # Lets refresh.py update the regression from new partitions only
+                stats = LinearSufficientStats.from_data(X_train, y_train)
+                stats.save(config["refresh"]["linear_stats_path"])
+            # Log model metrics to MLflow if enabled
+            if args.mlflow:
+                model_tracker = tracker.child(model_type)
+                model_tracker.log_model_async(model, model_type, X_train)
+                model_tracker.log_params(model.get_params())
+                model_tracker.log_param("Model Pickle Path", model_path)
+                model_tracker.log_metrics(
+                    {"RMSE": rmse, "MAE": mae, "Train Time": train_times[model_type]}
                 )
-                params = model.get_params()
-                for key, value in params.items():
-                    mlflow.log_param(key, value)
-                mlflow.log_metric("RMSE", rmse)
-                mlflow.log_metric("MAE", mae)
-                mlflow.log_param("Model Pickle Path", model_path)
-    logging.info("Model training completed.")
-    # End MLflow run if it was started
-    if args.mlflow:
-        mlflow.end_run()
-        logging.info("MLflow run ended.")
+        logging.info("Model training completed.")
+
+        # Training times are joined into the scoring comparison table
+        report_path = config["training_report_path"]
+        report = pd.Series(train_times, name="train_time_s").rename_axis("model_type")
+        if os.path.exists(report_path):
+            previous = pd.read_csv(report_path, index_col="model_type")["train_time_s"]
+            report = report.combine_first(previous)
+        os.makedirs(os.path.dirname(report_path), exist_ok=True)
+        report.to_csv(report_path)
+        # End MLflow run if it was started
+        if args.mlflow:
+            # Waits for the background model uploads
+            tracker.close()
+            mlflow.end_run()
+            logging.info("MLflow run ended.")
 
 
 if __name__ == "__main__":
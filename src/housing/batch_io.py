@@ -0,0 +1,129 @@
+import logging
+import sys
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+INPUT_FORMATS = ("json", "arrow", "numpy")
+
+# Reading from or writing to "-" uses stdin/stdout, so batches can be piped
+STDIO = "-"
+
+
+def _pyarrow():
+    # pyarrow is optional; only the Arrow format needs it
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            "Arrow batches need pyarrow, install it with `pip install fsds[arrow]`"
+        ) from e
+    return pa
+
+
+def _arrow_column(column):
+    pa = _pyarrow()
+    column = column.combine_chunks()
+    if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+        # Strings stay dictionary encoded: integer codes plus a few labels
+        column = column.dictionary_encode()
+    if pa.types.is_dictionary(column.type):
+        codes = column.indices.fill_null(-1).to_numpy()
+        return pd.Categorical.from_codes(
+            codes, categories=column.dictionary.to_pylist()
+        )
+    # Zero-copy for null-free numeric columns; nulls become NaN
+    return column.to_numpy(zero_copy_only=False)
+
+
+def read_arrow(source):
+    """Columns of an Arrow IPC stream or file as NumPy arrays.
+
+    Files, including ones in ``/dev/shm``, are memory-mapped so numeric
+    columns are views of the mapped buffers rather than copies.
+    """
+    pa = _pyarrow()
+    if source == STDIO:
+        table = pa.ipc.open_stream(sys.stdin.buffer).read_all()
+    else:
+        try:
+            table = pa.ipc.open_file(pa.memory_map(source)).read_all()
+        except pa.ArrowInvalid:
+            table = pa.ipc.open_stream(pa.memory_map(source)).read_all()
+    logger.info("Read Arrow batch of %d rows", table.num_rows)
+    return {name: _arrow_column(table.column(name)) for name in table.column_names}
+
+
+def _read_npy_stream(stream):
+    version = np.lib.format.read_magic(stream)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+    return np.frombuffer(stream.read(), dtype=dtype).reshape(shape)
+
+
+def _record_column(field):
+    if field.dtype.kind in "US":
+        # Fixed-width strings are factorized in C, without Python objects
+        labels, codes = np.unique(field, return_inverse=True)
+        return pd.Categorical.from_codes(codes, categories=labels.astype(str))
+    return field
+
+
+def read_numpy(source):
+    """Fields of a NumPy record array saved in ``.npy`` format.
+
+    Files are memory-mapped and numeric fields are used as strided views
+    into the records.
+    """
+    if source == STDIO:
+        records = _read_npy_stream(sys.stdin.buffer)
+    else:
+        records = np.load(source, mmap_mode="r")
+    if records.dtype.names is None:
+        raise ValueError("NumPy batches must be record arrays with named fields")
+    logger.info("Read NumPy batch of %d rows", len(records))
+    return {name: _record_column(records[name]) for name in records.dtype.names}
+
+
+def read_batch(source, input_format):
+    if input_format == "arrow":
+        return read_arrow(source)
+    if input_format == "numpy":
+        return read_numpy(source)
+    raise ValueError(f"Unsupported batch format: {input_format}")
+
+
+def write_predictions(predictions, sink, output_format):
+    """Write predictions in the batch format they were requested in."""
+    predictions = np.asarray(predictions, dtype=np.float64)
+    if output_format == "arrow":
+        pa = _pyarrow()
+        table = pa.table({"prediction": predictions})
+        if sink == STDIO:
+            with pa.ipc.new_stream(sys.stdout.buffer, table.schema) as writer:
+                writer.write_table(table)
+            sys.stdout.buffer.flush()
+        else:
+            with (
+                pa.OSFile(sink, "wb") as f,
+                pa.ipc.new_stream(f, table.schema) as writer,
+            ):
+                writer.write_table(table)
+    elif output_format == "numpy":
+        records = np.empty(len(predictions), dtype=[("prediction", "f8")])
+        records["prediction"] = predictions
+        if sink == STDIO:
+            np.save(sys.stdout.buffer, records)
+            sys.stdout.buffer.flush()
+        else:
+            # Written through a handle so np.save does not append ".npy"
+            with open(sink, "wb") as f:
+                np.save(f, records)
+    else:
+        raise ValueError(f"Unsupported batch format: {output_format}")
+    logger.info("Wrote %d predictions as %s", len(predictions), output_format)
@@ -17,8 +17,8 @@ def fetch_data(config_path="config/config.yaml"):
     os.makedirs(data_dir, exist_ok=True)
     tgz_path = os.path.join(data_dir, "housing.tgz")
 
-    logging.info(f"Downloading dataset from {url}")
+    logger.info("Downloading dataset from %s", url)
     urllib.request.urlretrieve(url, tgz_path)
     with tarfile.open(tgz_path) as housing_tgz:
         housing_tgz.extractall(path=data_dir)
-    logging.info(f"Dataset downloaded and extracted to {data_dir}")
+    logger.info("Dataset downloaded and extracted to %s", data_dir)
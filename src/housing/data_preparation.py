@@ -4,9 +4,10 @@ import os
 import numpy as np
 import pandas as pd
 import yaml
-from sklearn.impute import SimpleImputer
 from sklearn.model_selection import StratifiedShuffleSplit
 
+from housing.feature_spec import compile_feature_spec
+
 logger = logging.getLogger(__name__)
 
 
@@ -33,59 +34,8 @@ def stratified_split(data, testsize=0.2, splits=1):
     return strat_train, strat_test
 
 
-def prepare_data(data):
-    data = data.copy()
-
-    # Feature engineering
-    data["rooms_per_household"] = data["total_rooms"] / data["households"]
-    data["bedrooms_per_room"] = data["total_bedrooms"] / data["total_rooms"]
-    data["population_per_household"] = data["population"] / data["households"]
-
-    # Separate numeric columns
-    num = data.drop("ocean_proximity", axis=1)
-    imputer = SimpleImputer(strategy="median")
-    num_prepared = pd.DataFrame(
-        imputer.fit_transform(num),
-        columns=num.columns,
-        index=data.index,
-    )
-    logging.info("Imputation of numeric columns complete.")
-
-    # Handle categorical variable
-    expected_categories = ["<1H OCEAN", "INLAND", "ISLAND", "NEAR BAY", "NEAR OCEAN"]
-    data["ocean_proximity"] = data["ocean_proximity"].astype(str)
-    data["ocean_proximity"] = pd.Categorical(
-        data["ocean_proximity"], categories=expected_categories, ordered=True
-    )
-
-    # Get dummy variables (drop_first=True to avoid dummy trap)
-    cat_encoded = pd.get_dummies(data["ocean_proximity"], drop_first=True)
-
-    # Ensure all expected dummy columns exist
-    expected_dummies = pd.get_dummies(
-        pd.Categorical(
-            expected_categories, categories=expected_categories, ordered=True
-        ),
-        drop_first=True,
-    ).columns
-
-    if (
-        len(list(set(cat_encoded.columns.tolist()) - set(expected_dummies.tolist())))
-        != 0
-    ):
-        for col in list(
-            set(expected_dummies.tolist()) - set(cat_encoded.columns.tolist())
-        ):
-            logging.info(f"Adding {col} as dummy variable")
-            cat_encoded[col] = 0
-
-    # Make sure column order is consistent
-    cat_encoded = cat_encoded[expected_dummies]
-
-    # Merging the dataframe
-    full_data = pd.concat(
-        [num_prepared, cat_encoded.set_index(num_prepared.index)], axis=1
-    )  #
-    logging.info("Dummy columns created for categorical variable.")
-
-    return full_data, imputer
+def prepare_data(data, feature_spec=None, imputer=None):
+    # Features, imputation and dummies come from one compiled feature spec;
+    # pass a fitted imputer to reuse training medians at inference time
+    transform = compile_feature_spec(feature_spec)
+    return transform.transform(data, imputer=imputer)
@@ -0,0 +1,217 @@
+import json
+import logging
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from sklearn.impute import SimpleImputer
+
+from housing.streaming_stats import StreamingMedianImputer
+
+logger = logging.getLogger(__name__)
+
+# Mirrors the "features" section of config/config.yaml
+DEFAULT_FEATURE_SPEC = {
+    "numeric": [
+        "longitude",
+        "latitude",
+        "housing_median_age",
+        "total_rooms",
+        "total_bedrooms",
+        "population",
+        "households",
+        "median_income",
+    ],
+    "derived": [
+        {
+            "name": "rooms_per_household",
+            "op": "ratio",
+            "inputs": ["total_rooms", "households"],
+        },
+        {
+            "name": "bedrooms_per_room",
+            "op": "ratio",
+            "inputs": ["total_bedrooms", "total_rooms"],
+        },
+        {
+            "name": "population_per_household",
+            "op": "ratio",
+            "inputs": ["population", "households"],
+        },
+    ],
+    "categorical": [
+        {
+            "name": "ocean_proximity",
+            "categories": ["<1H OCEAN", "INLAND", "ISLAND", "NEAR BAY", "NEAR OCEAN"],
+            "drop_first": True,
+        }
+    ],
+    "imputer": {"strategy": "median"},
+}
+
+# Number of input columns each derived operation takes
+DERIVED_OPS = {"ratio": 2, "product": 2, "log": 1, "log1p": 1, "bucketize": 1}
+
+# "median" sorts every column exactly; "approximate_median" uses quantile
+# sketches, one pass and bounded memory, with a rank error of about 1 / k
+IMPUTER_STRATEGIES = ("median", "approximate_median")
+
+
+def _num_rows(data):
+    if isinstance(data, pd.DataFrame):
+        return len(data)
+    return len(next(iter(data.values())))
+
+
+def _numeric_column(values):
+    if isinstance(values, pd.Series):
+        return values.to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.asarray(values, dtype=np.float64)
+
+
+def _category_codes(categories, values):
+    if isinstance(values, pd.Series) and isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.array
+    if isinstance(values, pd.Categorical):
+        # Map the few distinct labels once instead of looking up every row
+        lookup = np.append(categories.get_indexer(values.categories), -1)
+        return lookup[values.codes]
+    return categories.get_indexer(values)
+
+
+class FeatureTransform:
+    """Feature spec compiled into a fixed plan over one preallocated matrix.
+
+    Raw numeric columns are copied into a column-major float64 matrix, every
+    derived feature is written in place into its own column by a NumPy ufunc
+    with ``out=``, missing values are filled in place and indicator columns
+    are set from category codes, so no intermediate frames are allocated.
+
+    ``data`` may be a DataFrame or a mapping of column name to array, such
+    as the columns of an Arrow table or a NumPy record array.
+    """
+
+    def __init__(self, spec):
+        self.numeric = list(spec.get("numeric", []))
+        self.categorical = list(spec.get("categorical", []))
+        positions = {name: idx for idx, name in enumerate(self.numeric)}
+
+        self.steps = []
+        for feature in spec.get("derived", []):
+            op = feature["op"]
+            if op not in DERIVED_OPS:
+                raise ValueError(f"Unknown feature op '{op}' for {feature['name']}")
+            inputs = feature["inputs"]
+            if len(inputs) != DERIVED_OPS[op]:
+                raise ValueError(
+                    f"Feature {feature['name']} needs {DERIVED_OPS[op]} inputs for {op}"
+                )
+            missing = [col for col in inputs if col not in positions]
+            if missing:
+                raise ValueError(f"Feature {feature['name']} uses unknown {missing}")
+            args = tuple(positions[col] for col in inputs)
+            positions[feature["name"]] = len(positions)
+            self.steps.append((op, positions[feature["name"]], args, feature))
+
+        imputer_spec = spec.get("imputer", {})
+        self.imputer_strategy = imputer_spec.get("strategy", "median")
+        if self.imputer_strategy not in IMPUTER_STRATEGIES:
+            raise ValueError(f"Unknown imputer strategy '{self.imputer_strategy}'")
+        self.imputer_k = imputer_spec.get("k", 200)
+        self.imputer_seed = imputer_spec.get("seed", 42)
+
+        self.n_imputed = len(positions)
+        self.columns = list(positions)
+        self.indicators = []
+        for feature in self.categorical:
+            categories = list(feature["categories"])
+            kept = categories[1:] if feature.get("drop_first", True) else categories
+            for category in kept:
+                self.indicators.append((feature["name"], categories.index(category)))
+                self.columns.append(category)
+
+    def _evaluate(self, data):
+        n_rows = _num_rows(data)
+        out = np.empty((n_rows, len(self.columns)), dtype=np.float64, order="F")
+        for idx, col in enumerate(self.numeric):
+            out[:, idx] = _numeric_column(data[col])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for op, target, args, feature in self.steps:
+                column = out[:, target]
+                if op == "ratio":
+                    np.divide(out[:, args[0]], out[:, args[1]], out=column)
+                elif op == "product":
+                    np.multiply(out[:, args[0]], out[:, args[1]], out=column)
+                elif op == "log":
+                    np.log(out[:, args[0]], out=column)
+                elif op == "log1p":
+                    np.log1p(out[:, args[0]], out=column)
+                elif op == "bucketize":
+                    column[:] = np.searchsorted(
+                        feature["boundaries"], out[:, args[0]], side="right"
+                    )
+        return out
+
+    def _encode(self, data, out):
+        codes = {}
+        for feature in self.categorical:
+            categories = pd.Index(feature["categories"])
+            codes[feature["name"]] = _category_codes(categories, data[feature["name"]])
+        # Unknown categories get code -1 and therefore all-zero indicators
+        for offset, (name, code) in enumerate(self.indicators):
+            np.equal(codes[name], code, out=out[:, self.n_imputed + offset])
+
+    def new_imputer(self):
+        if self.imputer_strategy == "approximate_median":
+            return StreamingMedianImputer(
+                k=self.imputer_k, random_state=self.imputer_seed
+            )
+        return SimpleImputer(strategy="median")
+
+    def fit_imputer(self, chunks):
+        """Approximate median imputer from one pass over raw data chunks.
+
+        ``chunks`` is any iterable of frames, such as
+        ``pd.read_csv(path, chunksize=...)``, so the full matrix never has
+        to be held in memory.
+        """
+        imputer = StreamingMedianImputer(
+            k=self.imputer_k, random_state=self.imputer_seed
+        )
+        n_imputed = self.n_imputed
+        for chunk in chunks:
+            imputer.partial_fit(self._evaluate(chunk)[:, :n_imputed])
+        return imputer
+
+    def transform(self, data, imputer=None):
+        out = self._evaluate(data)
+        n_imputed = self.n_imputed
+        numeric = out[:, :n_imputed]
+
+        # Without a fitted imputer the medians come from this data, as before
+        if imputer is None:
+            imputer = self.new_imputer()
+            imputer.fit(numeric)
+        missing = np.isnan(numeric)
+        if missing.any():
+            np.copyto(numeric, imputer.statistics_, where=missing)
+        logger.debug("Imputation of numeric columns complete.")
+
+        self._encode(data, out)
+        logger.debug("Dummy columns created for categorical variable.")
+
+        index = getattr(data, "index", None)
+        frame = pd.DataFrame(out, columns=self.columns, index=index, copy=False)
+        return frame, imputer
+
+
+@lru_cache(maxsize=8)
+def _compile(spec_json):
+    return FeatureTransform(json.loads(spec_json))
+
+
+def compile_feature_spec(spec=None):
+    # Compiled plans are cached per distinct spec
+    spec = DEFAULT_FEATURE_SPEC if spec is None else spec
+    return _compile(json.dumps(spec, sort_keys=True))
@@ -0,0 +1,272 @@
+import http.client
+import itertools
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import numpy as np
+import pandas as pd
+
+from housing.synthetic_data import synthetic_housing
+
+logger = logging.getLogger(__name__)
+
+# Upper edges, in milliseconds, of the latency histogram buckets
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, np.inf)
+
+
+def load_request_log(path):
+    """Payloads from a JSONL log, one record or list of records per line."""
+    payloads = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                payload = json.loads(line)
+                payloads.append(payload if isinstance(payload, list) else [payload])
+    return payloads
+
+
+def synthetic_requests(n_requests, rows_per_request=1, seed=42):
+    """Housing-schema payloads, labels included so the CLI can score them."""
+    records = synthetic_housing(n_requests * rows_per_request, seed).to_dict(
+        orient="records"
+    )
+    return [list(batch) for batch in itertools.batched(records, rows_per_request)]
+
+
+class HttpTarget:
+    """POSTs payloads to a serving endpoint over per-thread keep-alive."""
+
+    def __init__(self, url, timeout=30):
+        parsed = urlparse(url)
+        self.host, self.port = parsed.hostname, parsed.port or 80
+        self.path = parsed.path or "/predict"
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        if not hasattr(self._local, "conn"):
+            self._local.conn = http.client.HTTPConnection(
+                self.host, self.port, timeout=self.timeout
+            )
+        return self._local.conn
+
+    def send(self, payload):
+        conn = self._connection()
+        try:
+            conn.request(
+                "POST",
+                self.path,
+                json.dumps(payload),
+                {"Content-Type": "application/json"},
+            )
+            response = conn.getresponse()
+            response.read()
+            return response.status == 200
+        except (OSError, http.client.HTTPException):
+            # Reconnect on the next request from this thread
+            conn.close()
+            del self._local.conn
+            return False
+
+
+class CliTarget:
+    """Runs ``scripts/infer.py`` once per payload, as batch callers do."""
+
+    def __init__(self, model, config=None, script="scripts/infer.py"):
+        self.command = [sys.executable, script, "--model", model, "--no-console-log"]
+        if config:
+            self.command += ["--config", config]
+
+    def send(self, payload):
+        with tempfile.NamedTemporaryFile(suffix=".csv") as output:
+            result = subprocess.run(
+                self.command
+                + ["--input", json.dumps(payload), "--output", output.name],
+                capture_output=True,
+            )
+        return result.returncode == 0
+
+
+def _process_tree(pid):
+    pids = [pid]
+    for task in os.listdir(f"/proc/{pid}/task"):
+        try:
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children = [int(child) for child in f.read().split()]
+        except OSError:
+            continue
+        for child in children:
+            pids.extend(_process_tree(child))
+    return pids
+
+
+def _cpu_seconds_and_rss(pids):
+    cpu, rss = 0.0, 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                # Fields after the parenthesised command name
+                fields = f.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{pid}/statm") as f:
+                resident_pages = int(f.read().split()[1])
+        except OSError:
+            continue
+        cpu += (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+        rss += resident_pages * os.sysconf("SC_PAGE_SIZE")
+    return cpu, rss
+
+
+class ResourceSampler(threading.Thread):
+    """Samples CPU and RSS of a process and its children from /proc."""
+
+    def __init__(self, pid=None, interval=0.5):
+        super().__init__(daemon=True)
+        self.pid = pid or os.getpid()
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        start = time.perf_counter()
+        last_time, last_cpu = start, _cpu_seconds_and_rss(_process_tree(self.pid))[0]
+        while not self._stop_event.wait(self.interval):
+            now = time.perf_counter()
+            try:
+                cpu, rss = _cpu_seconds_and_rss(_process_tree(self.pid))
+            except OSError:
+                break
+            self.samples.append(
+                {
+                    "elapsed_s": now - start,
+                    "cpu_percent": 100 * (cpu - last_cpu) / (now - last_time),
+                    "rss_mb": rss / 2**20,
+                }
+            )
+            last_time, last_cpu = now, cpu
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        return self.samples
+
+
+def run_load(target, payloads, n_requests=None, duration=None, qps=None, concurrency=1):
+    """Send payloads, cycling through them, and time every request.
+
+    With ``qps`` requests are issued on a fixed schedule (open loop) and
+    latency counts from the scheduled time, so a slow target cannot hide
+    queueing delay. Otherwise ``concurrency`` threads each send their next
+    request as soon as the previous one returns (closed loop).
+    """
+    if n_requests is None and duration is None:
+        n_requests = len(payloads)
+    payload_iter = itertools.cycle(payloads)
+    lock = threading.Lock()
+    results = []
+    start = time.perf_counter()
+
+    def send(scheduled):
+        ok = target.send(next_payload())
+        end = time.perf_counter()
+        with lock:
+            results.append((scheduled - start, end - scheduled, ok))
+
+    def next_payload():
+        with lock:
+            return next(payload_iter)
+
+    def more(issued, now):
+        if n_requests is not None and issued >= n_requests:
+            return False
+        return duration is None or now - start < duration
+
+    if qps:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for issued in itertools.count():
+                scheduled = start + issued / qps
+                if not more(issued, scheduled):
+                    break
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(send, scheduled)
+    else:
+        counter = itertools.count()
+
+        def worker():
+            while True:
+                with lock:
+                    issued = next(counter)
+                if not more(issued, time.perf_counter()):
+                    return
+                send(time.perf_counter())
+
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return results, time.perf_counter() - start
+
+
+def summarize_load(results, wall_time, resource_samples=(), settings=None):
+    latencies_ms = np.array([latency for _, latency, _ in results]) * 1e3
+    errors = sum(not ok for _, _, ok in results)
+    counts, _ = np.histogram(latencies_ms, bins=(0,) + LATENCY_BUCKETS_MS)
+    report = {
+        "settings": settings or {},
+        "requests": len(results),
+        "errors": errors,
+        "error_rate": errors / len(results) if results else 0.0,
+        "wall_time_s": wall_time,
+        "throughput_rps": len(results) / wall_time if wall_time else 0.0,
+        "latency_ms": {
+            "mean": float(latencies_ms.mean()) if len(results) else None,
+            "p50": float(np.percentile(latencies_ms, 50)) if len(results) else None,
+            "p90": float(np.percentile(latencies_ms, 90)) if len(results) else None,
+            "p99": float(np.percentile(latencies_ms, 99)) if len(results) else None,
+            "max": float(latencies_ms.max()) if len(results) else None,
+        },
+        "latency_histogram_ms": {
+            f"le_{edge:g}": int(count)
+            for edge, count in zip(LATENCY_BUCKETS_MS, counts)
+        },
+        "resources": list(resource_samples),
+    }
+    if resource_samples:
+        report["peak_rss_mb"] = max(s["rss_mb"] for s in resource_samples)
+        report["mean_cpu_percent"] = float(
+            np.mean([s["cpu_percent"] for s in resource_samples])
+        )
+    return report
+
+
+def save_report(report, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info("Load test report saved at %s", path)
+
+
+def compare_reports(before, after):
+    """Headline metrics of two saved reports side by side."""
+    rows = {}
+    for name, report in (("before", before), ("after", after)):
+        rows[name] = {
+            "throughput_rps": report["throughput_rps"],
+            "error_rate": report["error_rate"],
+            **{f"{k}_ms": v for k, v in report["latency_ms"].items()},
+            "peak_rss_mb": report.get("peak_rss_mb"),
+            "mean_cpu_percent": report.get("mean_cpu_percent"),
+        }
+    comparison = pd.DataFrame(rows).astype(float)
+    comparison["change_pct"] = 100 * (comparison["after"] / comparison["before"] - 1)
+    return comparison
@@ -1,33 +1,177 @@
+import atexit
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import threading
 
+# Background listener draining the log queue, when queue mode is enabled
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Render each record as a single JSON line."""
+
+    def format(self, record):
+        payload = {
+            "time": self.formatTime(record),
+            "logger": record.name,
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        # Structured fields passed through ``extra={"fields": {...}}``
+        fields = getattr(record, "fields", None)
+        if isinstance(fields, dict):
+            payload.update(fields)
+        return json.dumps(payload, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Let through only one in ``rate`` records of a high-frequency event.
+
+    Records are grouped by their unformatted message template, so
+    ``logger.debug("Predicted %s rows", n)`` is sampled as a single event.
+    Warnings and errors are never dropped.
+    """
+
+    def __init__(self, rate=100, max_level=logging.INFO):
+        super().__init__()
+        self.rate = max(int(rate), 1)
+        self.max_level = max_level
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if self.rate == 1 or record.levelno > self.max_level:
+            return True
+        key = (record.name, record.msg)
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        return count % self.rate == 0
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records as they are so the listener does all the formatting.
+
+    The stock ``prepare`` formats the message on the calling thread and drops
+    ``exc_info``, which would both slow the caller and lose tracebacks from
+    JSON logs.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def stop_logging_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def configure_logging(
+    log_level="INFO",
+    log_path=None,
+    console_log=True,
+    use_queue=False,
+    json_format=False,
+    sample_rate=1,
+):
+    stop_logging_listener()
 
-def configure_logging(log_level="INFO", log_path=None, console_log=True):
     log_level = getattr(logging, log_level.upper(), logging.INFO)
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
 
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
+    if json_format:
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        )
 
     if root_logger.hasHandlers():
         root_logger.handlers.clear()
 
+    handlers = []
     if log_path:
-        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
         file_handler = logging.FileHandler(log_path)
         file_handler.setFormatter(formatter)
-        root_logger.addHandler(file_handler)
+        handlers.append(file_handler)
 
     if console_log:
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
-        root_logger.addHandler(console_handler)
+        handlers.append(console_handler)
+
+    if use_queue:
+        # Callers only enqueue records; formatting and I/O happen on the
+        # listener thread so hot loops never block on disk or terminal writes
+        global _listener
+        log_queue = queue.SimpleQueue()
+        queue_handler = _DeferredQueueHandler(log_queue)
+        if sample_rate > 1:
+            queue_handler.addFilter(SamplingFilter(sample_rate))
+        root_logger.addHandler(queue_handler)
+        _listener = logging.handlers.QueueListener(
+            log_queue, *handlers, respect_handler_level=True
+        )
+        _listener.start()
+    else:
+        # Each sink counts records on its own so every one keeps one in N;
+        # a shared filter would be advanced once per handler for each record
+        for handler in handlers:
+            if sample_rate > 1:
+                handler.addFilter(SamplingFilter(sample_rate))
+            root_logger.addHandler(handler)
+
+    logging.getLogger(__name__).debug(
+        "Logging configured. Level: %s, File: %s, Console: %s, Queue: %s",
+        log_level,
+        log_path,
+        console_log,
+        use_queue,
+    )
+
 
-    logging.debug(
-        f"Logging configured. "
-        f"Level: {log_level}, "
-        f"File: {log_path}, "
-        f"Console: {console_log}"
+def add_logging_arguments(parser):
+    parser.add_argument(
+        "--log-level", default="INFO", help="Logging level (e.g. DEBUG, INFO)"
+    )
+    parser.add_argument("--log-path", help="Optional log file path")
+    parser.add_argument(
+        "--no-console-log", action="store_true", help="Suppress console logging"
+    )
+    parser.add_argument(
+        "--log-queue",
+        action="store_true",
+        help="Write logs from a background thread instead of the caller",
     )
+    parser.add_argument(
+        "--log-json", action="store_true", help="Emit logs as JSON lines"
+    )
+    parser.add_argument(
+        "--log-sample-rate",
+        type=int,
+        default=1,
+        help="Keep one in N repeated INFO/DEBUG records",
+    )
+
+
+def configure_logging_from_args(args):
+    configure_logging(
+        log_level=args.log_level,
+        log_path=args.log_path,
+        console_log=not args.no_console_log,
+        use_queue=args.log_queue,
+        json_format=args.log_json,
+        sample_rate=args.log_sample_rate,
+    )
+
+
+atexit.register(stop_logging_listener)
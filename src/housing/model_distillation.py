@@ -0,0 +1,62 @@
+import logging
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.tree import DecisionTreeRegressor
+
+logger = logging.getLogger(__name__)
+
+
+def augment_samples(X, n_samples, random_state=42):
+    rng = np.random.default_rng(random_state)
+    values = X.to_numpy(dtype=np.float64)
+
+    # Synthetic districts interpolate between two random training rows;
+    # indicator columns are copied from the first row so they stay one-hot
+    first = rng.integers(0, len(values), n_samples)
+    second = rng.integers(0, len(values), n_samples)
+    lam = rng.uniform(size=(n_samples, 1))
+    synthetic = values[first] + lam * (values[second] - values[first])
+
+    indicator = np.all(np.isin(values, (0.0, 1.0)), axis=0)
+    synthetic[:, indicator] = values[first][:, indicator]
+
+    return pd.DataFrame(synthetic, columns=X.columns).astype(X.dtypes.to_dict())
+
+
+def build_student(student_type, **params):
+    if student_type == "tree":
+        return DecisionTreeRegressor(
+            max_depth=params.get("max_depth", 10),
+            min_samples_leaf=params.get("min_samples_leaf", 5),
+            random_state=42,
+        )
+    if student_type == "boosting":
+        return GradientBoostingRegressor(
+            n_estimators=params.get("n_estimators", 100),
+            max_depth=params.get("max_depth", 4),
+            learning_rate=params.get("learning_rate", 0.1),
+            random_state=42,
+        )
+    raise ValueError(f"Unknown student type: {student_type}")
+
+
+def distill_model(teacher, X, student_type="boosting", synthetic_factor=1.0, **params):
+    n_synthetic = int(len(X) * synthetic_factor)
+    X_distill = pd.concat(
+        [X, augment_samples(X, n_synthetic)], axis=0, ignore_index=True
+    )
+    logger.info(
+        "Distilling %s into a %s student on %d rows (%d synthetic)",
+        type(teacher).__name__,
+        student_type,
+        len(X_distill),
+        n_synthetic,
+    )
+
+    # The student learns the teacher's predictions rather than the labels
+    soft_targets = teacher.predict(X_distill)
+    student = build_student(student_type, **params)
+    student.fit(X_distill, soft_targets)
+    return student
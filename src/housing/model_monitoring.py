@@ -2,6 +2,8 @@ import json
 import logging
 import os
 
+import numpy as np
+import pandas as pd
 from evidently import ColumnMapping
 from evidently.metric_preset import (
     DataDriftPreset,
@@ -10,6 +12,8 @@ from evidently.metric_preset import (
 )
 from evidently.report import Report
 
+from housing.streaming_stats import ColumnSketches, population_stability_index
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,7 +24,7 @@ def generate_evidently_reports(train, test, output_dir, target_col, model_type):
     # Column Mapping
     column_mapping = ColumnMapping(target=target_col, prediction="prediction")
 
-    logging.info("Generating Drift, Data Quality & Performance Reports...")
+    logger.info("Generating Drift, Data Quality & Performance Reports...")
 
     # Create reports
     reports = {
@@ -40,12 +44,12 @@ def generate_evidently_reports(train, test, output_dir, target_col, model_type):
             output_dir, model_type + "_" + name + "_report.html"
         )
         report.save_html(html_file_name)
-        logging.info(f"{name} HTML report saved at {html_file_name}")
+        logger.info("%s HTML report saved at %s", name, html_file_name)
         json_file_name = os.path.join(
             output_dir, model_type + "_" + name + "_report.json"
         )
         report.save_json(json_file_name)
-        logging.info(f"{name} JSON report saved at {json_file_name}")
+        logger.info("%s JSON report saved at %s", name, json_file_name)
 
     return {
         "data_drift": os.path.join(output_dir, model_type + "_data_drift_report.json"),
@@ -55,9 +59,17 @@ def generate_evidently_reports(train, test, output_dir, target_col, model_type):
     }
 
 
+def _column_p_value(info):
+    # Evidently reports a p-value test's p-value as its drift score; a p-value
+    # of 0.0 is the strongest drift and is kept
+    if info.get("stattest_name", "").endswith("p_value"):
+        return info.get("drift_score", np.nan)
+    return np.nan if info.get("p_value") is None else info["p_value"]
+
+
 def check_data_drift(report_path, drift_ratio_threshold=0.2):
 
-    logging.info("Checking for Data Drift...")
+    logger.info("Checking for Data Drift...")
 
     # Loading the report
     with open(report_path) as f:
@@ -76,15 +88,15 @@ def check_data_drift(report_path, drift_ratio_threshold=0.2):
                 if info.get("drift_detected"):
                     drifted_columns[col] = {
                         "score": info.get("drift_score"),
-                        "p_value": info.get("p_value"),
-                        "stat_test": info.get("stat_test_name"),
+                        "p_value": _column_p_value(info),
+                        "stat_test": info.get("stattest_name"),
                     }
                     drifted_count += 1
 
             drift_ratio = drifted_count / total_columns if total_columns else 0
 
             if drift_ratio > drift_ratio_threshold:
-                logging.info("Data Drift Detected!")
+                logger.info("Data Drift Detected!")
                 print(
                     f"Drift detected in {drifted_count}/{total_columns} features"
                     f"({drift_ratio:.2%} > {drift_ratio_threshold:.2%})"
@@ -96,7 +108,7 @@ def check_data_drift(report_path, drift_ratio_threshold=0.2):
                     )
                 return drift_ratio, False
             else:
-                logging.info("Data Drift in acceptable range.")
+                logger.info("Data Drift in acceptable range.")
                 print(
                     f"Drift within acceptable range"
                     f"({drifted_count}/{total_columns} = {drift_ratio:.2%})"
@@ -104,13 +116,13 @@ def check_data_drift(report_path, drift_ratio_threshold=0.2):
                 return drift_ratio, True
 
     # If "DataDriftTable" metric not found
-    logging.warning("DataDriftTable metric not found in the report.")
+    logger.warning("DataDriftTable metric not found in the report.")
     return 0.0, True
 
 
 def check_model_performance(report_path, threshold=0.75):
 
-    logging.info("Checking Model Performance...")
+    logger.info("Checking Model Performance...")
     # Reading teh reports
     with open(report_path) as f:
         report = json.load(f)
@@ -120,14 +132,94 @@ def check_model_performance(report_path, threshold=0.75):
             r2 = metric["result"]["current"].get("r2_score")
             if r2 is not None:
                 print(f"R² Score: {r2:.4f}")
-                logging.info(f"R² Score: {r2:.4f}")
+                logger.info("R² Score: %.4f", r2)
                 if r2 < threshold:
                     print(f"R² below threshold {threshold}")
-                    logging.info(f"R² below threshold {threshold}")
+                    logger.info("R² below threshold %s", threshold)
                     return r2, False
                 print("Model quality is acceptable.")
-                logging.info("Model quality is acceptable.")
+                logger.info("Model quality is acceptable.")
                 return r2, True
-    logging.info("R² score missing in report.")
+    logger.info("R² score missing in report.")
     print("R² score missing in report.")
     return False
+
+
+def check_performance(metrics, threshold=0.75):
+    """Same check as ``check_model_performance`` on a RegressionAccumulator."""
+
+    logger.info("Checking Model Performance...")
+    r2 = metrics.r2
+    print(f"R² Score: {r2:.4f}")
+    logger.info(
+        "R² Score: %.4f (RMSE %.2f, MAE %.2f, bias %.2f over %d rows)",
+        r2,
+        metrics.rmse,
+        metrics.mae,
+        metrics.bias,
+        metrics.n,
+    )
+    if r2 < threshold:
+        print(f"R² below threshold {threshold}")
+        logger.info("R² below threshold %s", threshold)
+        return r2, False
+    print("Model quality is acceptable.")
+    logger.info("Model quality is acceptable.")
+    return r2, True
+
+
+def summarize_reports(report_paths):
+    # Flatten the Evidently JSON once so results can be stored as history
+    with open(report_paths["data_drift"]) as f:
+        drift_report = json.load(f)
+    with open(report_paths["performance"]) as f:
+        performance_report = json.load(f)
+
+    column_drift = []
+    for metric in drift_report.get("metrics", []):
+        if metric["metric"] == "DataDriftTable":
+            for col, info in metric["result"].get("drift_by_columns", {}).items():
+                column_drift.append(
+                    {
+                        "column": col,
+                        "stat_test": info.get("stattest_name", ""),
+                        "drift_score": info.get("drift_score", np.nan),
+                        "p_value": _column_p_value(info),
+                        "drift_detected": bool(info.get("drift_detected")),
+                    }
+                )
+
+    summary = {"r2": np.nan, "rmse": np.nan, "mae": np.nan}
+    for metric in performance_report.get("metrics", []):
+        if metric["metric"] == "RegressionQualityMetric":
+            current = metric["result"]["current"]
+            summary["r2"] = current.get("r2_score", np.nan)
+            summary["rmse"] = current.get("rmse", np.nan)
+            summary["mae"] = current.get("mean_abs_error", np.nan)
+
+    drifted = sum(row["drift_detected"] for row in column_drift)
+    summary["drifted_columns"] = drifted
+    summary["drift_ratio"] = drifted / len(column_drift) if column_drift else 0.0
+    return summary, column_drift
+
+
+def sketch_drift(reference, current, columns, k=200, n_bins=10):
+    """Population stability index of each column from quantile sketches.
+
+    Both sides are reduced to sketches first, so the reference can be
+    built once, or merged from chunks, without keeping the raw rows.
+    """
+    reference_sketches = ColumnSketches(columns, k).update(reference)
+    current_sketches = ColumnSketches(columns, k).update(current)
+    rows = []
+    for col in columns:
+        ref, cur = reference_sketches.sketches[col], current_sketches.sketches[col]
+        rows.append(
+            {
+                "column": col,
+                "psi": population_stability_index(ref, cur, n_bins=n_bins),
+                "reference_median": ref.median(),
+                "current_median": cur.median(),
+            }
+        )
+    return pd.DataFrame(rows).set_index("column")
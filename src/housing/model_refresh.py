@@ -0,0 +1,146 @@
+import hashlib
+import json
+import logging
+import os
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+
+logger = logging.getLogger(__name__)
+
+# Model types that can absorb a new partition without refitting on all data
+REFRESHABLE_MODELS = (
+    "linear_regression",
+    "random_forest_random_search",
+    "random_forest_grid_search",
+)
+
+
+class LinearSufficientStats:
+    """Running ``X'X``, ``X'y`` and row count of a least-squares problem.
+
+    Adding a partition costs one pass over its rows, and the refitted
+    coefficients are those of a regression on every row seen so far.
+    """
+
+    def __init__(self, feature_names):
+        self.feature_names = list(feature_names)
+        size = len(self.feature_names) + 1
+        self.xtx = np.zeros((size, size))
+        self.xty = np.zeros(size)
+        self.n = 0
+
+    @staticmethod
+    def _design(X):
+        X = np.asarray(X, dtype=np.float64)
+        return np.column_stack([np.ones(len(X)), X])
+
+    @classmethod
+    def from_data(cls, X, y):
+        return cls(X.columns).update(X, y)
+
+    def update(self, X, y):
+        if list(X.columns) != self.feature_names:
+            raise ValueError("Partition features do not match the stored statistics")
+        design = self._design(X)
+        self.xtx += design.T @ design
+        self.xty += design.T @ np.asarray(y, dtype=np.float64)
+        self.n += len(design)
+        return self
+
+    def to_model(self):
+        """Solve the normal equations for a ``LinearRegression``.
+
+        Forming ``X'X`` squares the condition number of ``X``. Housing
+        features range from 0/1 dummies to room counts in the thousands, so
+        the system is first scaled to a unit diagonal, which removes the part
+        of the conditioning that comes from column scale alone; collinearity
+        between columns is still squared.
+        """
+        scale = np.sqrt(np.diag(self.xtx))
+        # All-zero columns, e.g. an unseen dummy, keep a unit scale
+        scale[scale == 0] = 1.0
+        scaled_xtx = self.xtx / np.outer(scale, scale)
+        # lstsq gives the minimum-norm solution when a dummy column is constant
+        scaled_coef, *_ = np.linalg.lstsq(scaled_xtx, self.xty / scale, rcond=None)
+        coef = scaled_coef / scale
+        model = LinearRegression()
+        model.intercept_ = coef[0]
+        model.coef_ = coef[1:]
+        model.n_features_in_ = len(self.feature_names)
+        model.feature_names_in_ = np.asarray(self.feature_names, dtype=object)
+        return model
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path):
+        return joblib.load(path)
+
+
+def refresh_forest(model, X, y, n_new_trees=10, max_trees=None):
+    """Add ``n_new_trees`` trees fitted on a new partition to a forest.
+
+    Existing trees are kept as they are, so the forest averages trees from
+    every partition. With ``max_trees`` the oldest trees are dropped first.
+    """
+    if not isinstance(model, RandomForestRegressor):
+        raise ValueError(f"Cannot warm start a {type(model).__name__}")
+    previous = len(model.estimators_)
+    model.set_params(warm_start=True, n_estimators=previous + n_new_trees)
+    model.fit(X, y)
+
+    pruned = 0
+    if max_trees is not None and len(model.estimators_) > max_trees:
+        pruned = len(model.estimators_) - max_trees
+        model.estimators_ = model.estimators_[pruned:]
+        model.set_params(n_estimators=len(model.estimators_))
+    logger.info(
+        "Forest refreshed: %d trees + %d new - %d pruned = %d",
+        previous,
+        n_new_trees,
+        pruned,
+        len(model.estimators_),
+    )
+    return model, pruned
+
+
+def partition_fingerprint(path):
+    """Hash of a partition file's contents, whatever path it is read from."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(2**20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def applied_partitions(lineage_path, model_type):
+    """Fingerprints of the partitions already folded into ``model_type``."""
+    if not os.path.exists(lineage_path):
+        return set()
+    with open(lineage_path) as f:
+        lineage = json.load(f)
+    return {
+        entry["partition_fingerprint"]
+        for entry in lineage
+        if entry["model_type"] == model_type and "partition_fingerprint" in entry
+    }
+
+
+def record_lineage(lineage_path, entry):
+    """Append one refresh record to the lineage JSON list."""
+    lineage = []
+    if os.path.exists(lineage_path):
+        with open(lineage_path) as f:
+            lineage = json.load(f)
+    lineage.append(entry)
+    os.makedirs(os.path.dirname(lineage_path) or ".", exist_ok=True)
+    tmp_path = lineage_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(lineage, f, indent=2, default=str)
+    os.replace(tmp_path, lineage_path)
+    return lineage
@@ -1,17 +1,95 @@
 import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import joblib
 import numpy as np
-from sklearn.metrics import mean_absolute_error, mean_squared_error
+import pandas as pd
+
+from housing.streaming_metrics import RegressionAccumulator
 
 logger = logging.getLogger(__name__)
 
+# Rows predicted at a time when scoring, so predictions never fill memory
+SCORE_CHUNK_ROWS = 100_000
+
+# Leading test rows re-predicted on their own to time each model
+LATENCY_SAMPLE_ROWS = 1_000
+
 
 def evaluate_model(model_path, X_test, y_test):
 
     model = joblib.load(model_path)
     predictions = model.predict(X_test)
 
-    rmse = np.sqrt(mean_squared_error(y_test, predictions))
-    mae = mean_absolute_error(y_test, predictions)
-    return predictions, rmse, mae
+    metrics = RegressionAccumulator().update(y_test, predictions)
+    return predictions, metrics.rmse, metrics.mae
+
+
+def evaluate_chunks(model, chunks, metrics=None):
+    """Fold ``(X, y)`` chunks through ``model`` without keeping predictions.
+
+    Memory stays bounded by one chunk however large the test set is; pass
+    ``metrics`` to keep accumulating into an existing accumulator.
+    """
+    metrics = metrics or RegressionAccumulator()
+    for X, y in chunks:
+        metrics.update(y, model.predict(X))
+    return metrics
+
+
+def _row_chunks(X, y, chunk_rows):
+    if not len(X):
+        return
+    n_chunks = -(-len(X) // chunk_rows)
+    for rows in np.array_split(np.arange(len(X)), n_chunks):
+        yield X.iloc[rows], y[rows]
+
+
+def _score_model(model_type, model_path, X_test, y_test, chunk_rows):
+    model = joblib.load(model_path)
+    metrics = evaluate_chunks(model, _row_chunks(X_test, y_test, chunk_rows))
+    return model, metrics.summary()
+
+
+def _latency_per_row_us(model, X_test):
+    # A bounded sample keeps timing cheap however large the test set is
+    sample = X_test.iloc[:LATENCY_SAMPLE_ROWS]
+    if not len(sample):
+        return np.nan
+    start = time.perf_counter()
+    model.predict(sample)
+    return (time.perf_counter() - start) / len(sample) * 1e6
+
+
+def score_models(model_paths, X_test, y_test, n_jobs=None, chunk_rows=SCORE_CHUNK_ROWS):
+    # Cast once to a single float block so every worker thread shares the
+    # same prepared matrix; prediction runs in Cython code that releases the GIL
+    X_test = X_test.astype(np.float64)
+    y_test = np.asarray(y_test, dtype=np.float64)
+    n_jobs = n_jobs or min(len(model_paths), os.cpu_count() or 1)
+
+    logger.info("Scoring %d models with %d workers", len(model_paths), n_jobs)
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        futures = {
+            model_type: executor.submit(
+                _score_model, model_type, path, X_test, y_test, chunk_rows
+            )
+            for model_type, path in model_paths.items()
+        }
+        scored = {model_type: future.result() for model_type, future in futures.items()}
+
+    # Latency is timed one model at a time on a sample, after the concurrent
+    # phase, so it does not include contention with the other models
+    rows = []
+    for model_type, (model, metrics) in scored.items():
+        rows.append(
+            {
+                "model_type": model_type,
+                **metrics,
+                "latency_per_row_us": _latency_per_row_us(model, X_test),
+                "model_size_mb": os.path.getsize(model_paths[model_type]) / 2**20,
+            }
+        )
+    return pd.DataFrame(rows).set_index("model_type")
@@ -2,7 +2,7 @@ import logging
 
 import numpy as np
 from scipy.stats import randint
-from sklearn.ensemble import RandomForestRegressor
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 from sklearn.model_selection import GridSearchCV, RandomizedSearchCV
@@ -49,6 +49,18 @@ def train_model(X, y, model_type):
         grid_search.fit(X, y)
         # Get best model
         model = grid_search.best_estimator_
+    if model_type == "hist_gradient_boosting":
+        # Histogram-binned boosting fits with OpenMP threads and stops once
+        # the held-out validation score has not improved for 20 iterations
+        model = HistGradientBoostingRegressor(
+            max_iter=1000,
+            learning_rate=0.1,
+            early_stopping=True,
+            validation_fraction=0.1,
+            n_iter_no_change=20,
+            random_state=42,
+        )
+        model.fit(X, y)
 
     # Get predictions
     predictions = model.predict(X)
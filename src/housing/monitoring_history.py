@@ -0,0 +1,130 @@
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# One .npy file per column and table; strings are fixed width so every
+# column can be memory-mapped without pickled objects
+RUN_SCHEMA = {
+    "run_id": "U32",
+    "timestamp": "datetime64[s]",
+    "model_type": "U64",
+    "model_version": "U32",
+    "r2": "f8",
+    "rmse": "f8",
+    "mae": "f8",
+    "drift_ratio": "f8",
+    "drifted_columns": "i4",
+    "drift_ok": "?",
+    "perf_ok": "?",
+}
+COLUMN_DRIFT_SCHEMA = {
+    "run_id": "U32",
+    "timestamp": "datetime64[s]",
+    "model_type": "U64",
+    "column": "U64",
+    "stat_test": "U64",
+    "drift_score": "f8",
+    "p_value": "f8",
+    "drift_detected": "?",
+}
+
+
+class MonitoringHistory:
+    """Append-only columnar store of monitoring results.
+
+    ``runs`` holds one row per monitoring run and ``column_drift`` one row
+    per feature per run. Queries read only the requested columns.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _column_path(self, table, column):
+        return os.path.join(self.path, table, f"{column}.npy")
+
+    def _append(self, table, schema, rows):
+        os.makedirs(os.path.join(self.path, table), exist_ok=True)
+        new = {col: np.asarray(rows[col], dtype=dtype) for col, dtype in schema.items()}
+        # Every column is written out before any is replaced, so an interrupted
+        # append leaves at most a partial set of renames, trimmed in _load
+        staged = []
+        for col, values in new.items():
+            path = self._column_path(table, col)
+            if os.path.exists(path):
+                existing = np.load(path)
+                values = np.concatenate([existing, values.astype(existing.dtype)])
+            tmp_path = path + ".tmp.npy"
+            np.save(tmp_path, values)
+            staged.append((tmp_path, path))
+        for tmp_path, path in staged:
+            os.replace(tmp_path, path)
+
+    def _load(self, table, schema, columns=None):
+        columns = list(schema) if columns is None else columns
+        data = {}
+        for col in columns:
+            path = self._column_path(table, col)
+            if os.path.exists(path):
+                data[col] = np.load(path, mmap_mode="r")
+            else:
+                data[col] = np.empty(0, dtype=schema[col])
+        # Rows are only ever appended, so the shortest column marks the last
+        # append that reached every file
+        n_rows = min(map(len, data.values()))
+        if any(len(values) != n_rows for values in data.values()):
+            logger.warning(
+                "Columns of %s have different lengths; keeping the first %d rows",
+                table,
+                n_rows,
+            )
+            data = {col: values[:n_rows] for col, values in data.items()}
+        return pd.DataFrame(data)
+
+    def append_run(self, summary, column_drift):
+        self._append("runs", RUN_SCHEMA, {col: [summary[col]] for col in RUN_SCHEMA})
+        # Per-column rows carry the run keys so they can be filtered on their own
+        shared = {col: summary[col] for col in ("run_id", "timestamp", "model_type")}
+        rows = [{**row, **shared} for row in column_drift]
+        drift_rows = {col: [row[col] for row in rows] for col in COLUMN_DRIFT_SCHEMA}
+        self._append("column_drift", COLUMN_DRIFT_SCHEMA, drift_rows)
+        logger.info("Appended monitoring run %s to %s", summary["run_id"], self.path)
+
+    def runs(self, model_type=None, since=None, columns=None):
+        if columns is not None:
+            columns = list(dict.fromkeys(["timestamp", "model_type", *columns]))
+        runs = self._load("runs", RUN_SCHEMA, columns)
+        if model_type is not None:
+            runs = runs[runs["model_type"] == model_type]
+        if since is not None:
+            runs = runs[runs["timestamp"] >= np.datetime64(since, "s")]
+        return runs.sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+    def column_drift(self, column=None, model_type=None):
+        drift = self._load("column_drift", COLUMN_DRIFT_SCHEMA)
+        if column is not None:
+            drift = drift[drift["column"] == column]
+        if model_type is not None:
+            drift = drift[drift["model_type"] == model_type]
+        return drift.sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+    def trend(self, metric, model_type=None, window=7, n_std=3.0):
+        """Rolling mean and control band of a run metric over time."""
+        runs = self.runs(model_type=model_type, columns=[metric])
+        # A band needs at least two runs; until then the bounds stay NaN and
+        # nothing is flagged
+        rolling = runs[metric].rolling(window, min_periods=2)
+        runs["rolling_mean"] = rolling.mean()
+        runs["rolling_std"] = rolling.std()
+        # Bands come from the preceding window so a run is not judged by itself
+        previous_mean = runs["rolling_mean"].shift(1)
+        previous_std = runs["rolling_std"].shift(1)
+        runs["lower_bound"] = previous_mean - n_std * previous_std
+        runs["upper_bound"] = previous_mean + n_std * previous_std
+        runs["out_of_band"] = (runs[metric] < runs["lower_bound"]) | (
+            runs[metric] > runs["upper_bound"]
+        )
+        return runs
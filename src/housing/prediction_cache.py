@@ -0,0 +1,140 @@
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+
+import joblib
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Decimal places kept when normalising numeric inputs before hashing
+KEY_PRECISION = 6
+
+
+def artifact_version(model_path, *artifact_paths, feature_spec=None):
+    """Short hash of the model file and anything else its predictions depend on.
+
+    Fitted preprocessing artifacts and the feature spec are folded in, so a
+    change to any of them gives a new version; missing paths are skipped.
+    """
+    digest = hashlib.sha256()
+    for path in (model_path, *artifact_paths):
+        if path is None or not os.path.exists(path):
+            continue
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(2**20), b""):
+                digest.update(chunk)
+    if feature_spec is not None:
+        digest.update(json.dumps(feature_spec, sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+def row_keys(raw_df, exclude=("median_house_value",)):
+    # Column order and float noise must not change the key; categories are
+    # kept exactly as given, since the feature transform matches them exactly
+    columns = sorted(col for col in raw_df.columns if col not in exclude)
+    normalized = {}
+    for col in columns:
+        values = raw_df[col]
+        if pd.api.types.is_numeric_dtype(values):
+            normalized[col] = values.astype(np.float64).round(KEY_PRECISION)
+        else:
+            normalized[col] = values.astype(str)
+    frame = pd.DataFrame(normalized, index=raw_df.index)
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+class PredictionCache:
+    """LRU cache of predictions keyed by normalised raw rows.
+
+    Each entry is a 64-bit row hash mapped to one float, so ``max_entries``
+    bounds memory at roughly ``max_entries * ENTRY_BYTES``. Keys are only
+    valid for the model artifact identified by ``model_version``.
+    """
+
+    ENTRY_BYTES = 120
+
+    def __init__(self, model_version, max_entries=100_000):
+        self.model_version = model_version
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def predict(self, raw_df, predict_fn, cache_incomplete=True):
+        """Return predictions for ``raw_df``, calling ``predict_fn`` on misses only.
+
+        With ``cache_incomplete=False`` rows with missing values always go
+        to ``predict_fn`` and are never stored, for when their imputed values
+        depend on the rest of the batch.
+        """
+        keys = row_keys(raw_df).tolist()
+        if cache_incomplete:
+            complete = [True] * len(keys)
+        else:
+            features = raw_df.drop(columns=["median_house_value"], errors="ignore")
+            complete = features.notna().all(axis=1).tolist()
+        predictions = np.empty(len(keys), dtype=np.float64)
+        miss_positions = []
+        for pos, key in enumerate(keys):
+            value = self._entries.get(key) if complete[pos] else None
+            if value is None:
+                miss_positions.append(pos)
+            else:
+                self._entries.move_to_end(key)
+                predictions[pos] = value
+
+        self.hits += len(keys) - len(miss_positions)
+        self.misses += len(miss_positions)
+
+        if miss_positions:
+            miss_predictions = np.asarray(
+                predict_fn(raw_df.iloc[miss_positions]), dtype=np.float64
+            )
+            predictions[miss_positions] = miss_predictions
+            for pos, value in zip(miss_positions, miss_predictions.tolist()):
+                if complete[pos]:
+                    self._entries[keys[pos]] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        logger.debug(
+            "Prediction cache: %d hits, %d misses",
+            len(keys) - len(miss_positions),
+            len(miss_positions),
+        )
+        return predictions
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "evictions": self.evictions,
+            "approx_bytes": len(self._entries) * self.ENTRY_BYTES,
+        }
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        joblib.dump(self, path)
+
+    @classmethod
+    def load(cls, path, model_version, max_entries=100_000):
+        # A cache written for another model artifact is discarded
+        if os.path.exists(path):
+            cache = joblib.load(path)
+            if cache.model_version == model_version:
+                cache.max_entries = max_entries
+                return cache
+            logger.info("Discarding prediction cache for stale model version.")
+        return cls(model_version, max_entries=max_entries)
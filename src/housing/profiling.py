@@ -0,0 +1,122 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger(__name__)
+
+# Allocations made by the profilers themselves are left out of the summary
+_IGNORED_TRACES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _hot_functions(profiler, top_n):
+    buffer = io.StringIO()
+    stats = pstats.Stats(profiler, stream=buffer)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top_n)
+    return buffer.getvalue()
+
+
+def _top_allocations(snapshot, top_n):
+    lines = []
+    for stat in snapshot.statistics("lineno")[:top_n]:
+        frame = stat.traceback[0]
+        lines.append(
+            f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  "
+            f"{frame.filename}:{frame.lineno}"
+        )
+    return "\n".join(lines)
+
+
+@contextmanager
+def profile_stage(stage, output_dir="logs", top_n=20):
+    """CPU profile and memory snapshot of the enclosed block.
+
+    Writes ``<stage>-<time>-<pid>.prof`` (load with ``pstats`` or
+    snakeviz), a ``.tracemalloc`` snapshot and a ``.txt`` summary of the
+    top ``top_n`` functions by cumulative time and allocation sites by
+    size, which is also logged.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    stem = os.path.join(
+        output_dir, f"{stage}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+    )
+
+    tracemalloc.start()
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        yield stem
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - start
+        snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED_TRACES)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        profiler.dump_stats(f"{stem}.prof")
+        snapshot.dump(f"{stem}.tracemalloc")
+        summary = (
+            f"Stage {stage}: {elapsed:.2f}s wall, "
+            f"peak traced memory {peak / 2**20:.1f} MiB\n\n"
+            f"Top {top_n} functions by cumulative time:\n"
+            f"{_hot_functions(profiler, top_n)}\n"
+            f"Top {top_n} allocation sites:\n"
+            f"{_top_allocations(snapshot, top_n)}\n"
+        )
+        with open(f"{stem}.txt", "w") as f:
+            f.write(summary)
+        logger.info("Profile of %s saved at %s.*\n%s", stage, stem, summary)
+
+
+def add_profiling_arguments(parser):
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Write a CPU profile and memory snapshot of this stage",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        help="Directory for profiles, defaults to the log file's directory or logs/",
+    )
+    parser.add_argument(
+        "--profile-top", type=int, default=20, help="Entries in the profile summary"
+    )
+
+
+def profile_dir_from_args(args):
+    if args.profile_dir:
+        return args.profile_dir
+    # Profiles sit alongside the logs when a log file is configured
+    if args.log_path:
+        return os.path.dirname(args.log_path) or "."
+    return "logs"
+
+
+def profile_from_args(args, stage):
+    # Nothing is started when profiling is off, so it costs nothing
+    if not args.profile:
+        return nullcontext()
+    return profile_stage(stage, profile_dir_from_args(args), top_n=args.profile_top)
+
+
+def profiling_passthrough_args(args):
+    """Arguments that propagate ``--profile`` to stage subprocesses."""
+    if not args.profile:
+        return []
+    return [
+        "--profile",
+        "--profile-dir",
+        profile_dir_from_args(args),
+        "--profile-top",
+        str(args.profile_top),
+    ]
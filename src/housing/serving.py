@@ -0,0 +1,213 @@
+import gc
+import json
+import logging
+import os
+import signal
+import socket
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import joblib
+import pandas as pd
+from threadpoolctl import threadpool_limits
+
+from housing.data_preparation import prepare_data
+from housing.feature_spec import compile_feature_spec
+from housing.spatial_features import apply_spatial_features, load_spatial_index
+
+logger = logging.getLogger(__name__)
+
+# A worker that dies sooner than this after starting is restarted with a delay
+MIN_WORKER_UPTIME_S = 1.0
+
+
+def process_memory(pid="self"):
+    """Resident and proportional set size of a process in MiB.
+
+    PSS splits pages shared between the forked workers evenly, so summing
+    it over workers gives their real combined footprint.
+    """
+    memory = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("Rss", "Pss", "Shared_Clean", "Private_Dirty"):
+                memory[key.lower() + "_mb"] = int(value.split()[0]) / 1024
+    return memory
+
+
+class ModelPredictor:
+    """Model and fitted preprocessing loaded once and shared by workers."""
+
+    def __init__(self, model_path, config=None, imputer_path=None):
+        self.model = joblib.load(model_path)
+        # Parallelism comes from the workers, not from threads inside each one
+        if "n_jobs" in self.model.get_params():
+            self.model.set_params(n_jobs=1)
+        self.imputer = joblib.load(imputer_path) if imputer_path else None
+        self.config = config
+        self.feature_spec = config["features"] if config else None
+        # Warm the caches before forking so workers share them
+        compile_feature_spec(self.feature_spec)
+        spatial_config = (config or {}).get("spatial_features", {})
+        if spatial_config.get("enabled", False):
+            load_spatial_index(spatial_config["index_path"])
+        logger.info("Loaded %s for serving", model_path)
+
+    def predict(self, records):
+        raw_df = pd.DataFrame(records)
+        X, _ = prepare_data(
+            raw_df, feature_spec=self.feature_spec, imputer=self.imputer
+        )
+        if self.config:
+            X = apply_spatial_features(X, raw_df, self.config)
+        return self.model.predict(X)
+
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    """``POST /predict`` with JSON records, ``GET /health`` for status."""
+
+    # Each worker serves one connection at a time, so the connection is
+    # closed after every response rather than kept alive; an idle keep-alive
+    # client would otherwise hold its worker and stall everyone queued on it
+    protocol_version = "HTTP/1.0"
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+        self._send_json(200, {"status": "ok", "pid": os.getpid(), **process_memory()})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            records = json.loads(self.rfile.read(length))
+            predictions = self.server.predictor.predict(records)
+        except (ValueError, KeyError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            logger.exception("Prediction failed")
+            self._send_json(500, {"error": str(e)})
+            return
+        self._send_json(200, {"predictions": predictions.tolist()})
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class PreforkServer:
+    """HTTP workers forked from a parent that holds the loaded model.
+
+    The parent binds one listening socket and forks ``workers`` processes
+    that accept on it, so the kernel spreads connections across them.
+    ``gc.freeze`` before forking keeps the collector from writing to the
+    model's objects, which lets workers share its pages copy-on-write.
+    Workers that exit are restarted until ``stop`` is called.
+    """
+
+    def __init__(self, predictor, host="127.0.0.1", port=8000, workers=None):
+        self.predictor = predictor
+        self.host = host
+        self.port = port
+        self.n_workers = workers or os.cpu_count()
+        self.workers = {}
+        self.socket = None
+        self._stopping = False
+
+    @property
+    def address(self):
+        return self.socket.getsockname()[:2]
+
+    def start(self):
+        self.socket = socket.create_server((self.host, self.port), backlog=1024)
+        gc.collect()
+        gc.freeze()
+        for _ in range(self.n_workers):
+            self._spawn()
+        logger.info(
+            "Serving on http://%s:%s with %d workers", *self.address, self.n_workers
+        )
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                self._run_worker()
+            except BaseException:
+                logger.exception("Worker %d failed", os.getpid())
+                status = 1
+            finally:
+                # Never return into the parent's code path in the child
+                os._exit(status)
+        self.workers[pid] = time.monotonic()
+        return pid
+
+    def _run_worker(self):
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        httpd = HTTPServer(self.address, PredictionHandler, bind_and_activate=False)
+        httpd.socket.close()
+        httpd.socket = self.socket
+        httpd.predictor = self.predictor
+        with threadpool_limits(limits=1):
+            httpd.serve_forever()
+
+    def reap(self, block=True):
+        """Wait for a worker to exit and restart it; returns the old pid."""
+        pid, status = os.waitpid(-1, 0 if block else os.WNOHANG)
+        if pid == 0 or pid not in self.workers:
+            return None
+        started = self.workers.pop(pid)
+        if self._stopping:
+            return pid
+        logger.warning(
+            "Worker %d exited with status %d, restarting",
+            pid,
+            os.waitstatus_to_exitcode(status),
+        )
+        if time.monotonic() - started < MIN_WORKER_UPTIME_S:
+            time.sleep(MIN_WORKER_UPTIME_S)
+        self._spawn()
+        return pid
+
+    def serve_forever(self):
+        if self.socket is None:
+            self.start()
+
+        def _handle_stop(signum, frame):
+            self.stop()
+
+        signal.signal(signal.SIGTERM, _handle_stop)
+        signal.signal(signal.SIGINT, _handle_stop)
+        while not self._stopping:
+            try:
+                self.reap()
+            except ChildProcessError:
+                break
+
+    def stop(self):
+        self._stopping = True
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+            self.workers.pop(pid, None)
+        if self.socket is not None:
+            self.socket.close()
+        gc.unfreeze()
+        logger.info("Server stopped")
@@ -0,0 +1,120 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+
+# Rows per query chunk when a batch is split across threads
+QUERY_CHUNK_ROWS = 50_000
+
+
+def _to_radians(data):
+    # Column access works for DataFrames and plain mappings of arrays alike
+    columns = [
+        np.asarray(data[col], dtype=np.float64) for col in ("latitude", "longitude")
+    ]
+    return np.radians(np.column_stack(columns))
+
+
+class SpatialNeighborIndex:
+    """Haversine ball tree over training districts with per-district values.
+
+    Built once from the training split and persisted with the model
+    artifacts, so neighbourhood aggregates cost a tree query per row instead
+    of a scan over every district.
+    """
+
+    def __init__(self, k=10, leaf_size=40, n_jobs=None):
+        self.k = k
+        self.leaf_size = leaf_size
+        self.n_jobs = n_jobs
+
+    def fit(self, data, target):
+        self.tree_ = BallTree(
+            _to_radians(data), leaf_size=self.leaf_size, metric="haversine"
+        )
+        self.income_ = data["median_income"].to_numpy(dtype=np.float64)
+        self.target_ = np.asarray(target, dtype=np.float64)
+        return self
+
+    def _query(self, points, k):
+        # BallTree.query releases the GIL, so large batches run on threads
+        if len(points) <= QUERY_CHUNK_ROWS:
+            return self.tree_.query(points, k=k)
+        chunks = np.array_split(points, -(-len(points) // QUERY_CHUNK_ROWS))
+        with ThreadPoolExecutor(max_workers=self.n_jobs or os.cpu_count()) as pool:
+            results = list(pool.map(lambda chunk: self.tree_.query(chunk, k=k), chunks))
+        return (
+            np.concatenate([dist for dist, _ in results]),
+            np.concatenate([idx for _, idx in results]),
+        )
+
+    def transform(self, data, leave_one_out=False):
+        """Neighbour aggregates for ``data``.
+
+        With ``leave_one_out`` the rows are assumed to be the fitted
+        districts, in order, and each row is dropped from its own neighbours
+        so the target mean does not leak the row's own label.
+        """
+        k = self.k + 1 if leave_one_out else self.k
+        distances, indices = self._query(_to_radians(data), k)
+        if leave_one_out:
+            # Districts sharing coordinates tie at distance zero, so the row
+            # itself is matched by position rather than assumed to come first;
+            # if it is not among the results the farthest neighbour goes instead
+            own = indices == np.arange(len(indices))[:, None]
+            own[~own.any(axis=1), -1] = True
+            distances = distances[~own].reshape(len(indices), self.k)
+            indices = indices[~own].reshape(len(indices), self.k)
+
+        return pd.DataFrame(
+            {
+                "neighbor_median_income": np.median(self.income_[indices], axis=1),
+                "neighbor_target_mean": self.target_[indices].mean(axis=1),
+                "neighbor_distance_km": distances.mean(axis=1) * EARTH_RADIUS_KM,
+            },
+            index=getattr(data, "index", None),
+        )
+
+    def fit_transform(self, data, target):
+        return self.fit(data, target).transform(data, leave_one_out=True)
+
+
+@lru_cache(maxsize=2)
+def load_spatial_index(index_path):
+    return joblib.load(index_path)
+
+
+def apply_spatial_features(X, raw_data, config, target=None, leave_one_out=False):
+    """Append neighbour features to a prepared matrix when enabled in config.
+
+    Passing ``target`` builds and saves a new index from ``raw_data``;
+    otherwise the persisted index is loaded.
+    """
+    spatial_config = config.get("spatial_features", {})
+    if not spatial_config.get("enabled", False):
+        return X
+
+    index_path = spatial_config["index_path"]
+    if target is not None:
+        index = SpatialNeighborIndex(k=spatial_config.get("k", 10))
+        features = index.fit_transform(raw_data, target)
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        joblib.dump(index, index_path)
+        load_spatial_index.cache_clear()
+        logger.info(
+            "Spatial index over %d districts saved at %s", len(raw_data), index_path
+        )
+    else:
+        index = load_spatial_index(index_path)
+        features = index.transform(raw_data, leave_one_out=leave_one_out)
+
+    return pd.concat([X, features.set_index(X.index)], axis=1)
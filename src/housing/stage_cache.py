@@ -0,0 +1,62 @@
+import hashlib
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def _hash_file(digest, path):
+    digest.update(path.encode())
+    if not os.path.exists(path):
+        digest.update(b"<missing>")
+        return
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(2**20), b""):
+            digest.update(chunk)
+
+
+def fingerprint(files=(), config=None, keys=(), code=()):
+    """Content hash of a stage's input files, config values and source files."""
+    digest = hashlib.sha256()
+    for path in sorted(files):
+        _hash_file(digest, path)
+    if config is not None:
+        values = {key: config.get(key) for key in sorted(keys)}
+        digest.update(json.dumps(values, sort_keys=True, default=str).encode())
+    for path in sorted(code):
+        _hash_file(digest, path)
+    return digest.hexdigest()
+
+
+class StageCache:
+    """Manifest of stage fingerprints used to skip stages whose inputs are unchanged."""
+
+    def __init__(self, manifest_path, force=False):
+        self.manifest_path = manifest_path
+        self.force = force
+        self.manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                self.manifest = json.load(f)
+
+    def is_fresh(self, stage, stage_fingerprint):
+        entry = self.manifest.get(stage)
+        if self.force or entry is None:
+            return False
+        if entry["fingerprint"] != stage_fingerprint:
+            return False
+        # Cached outputs must still be on disk to be reused
+        return all(os.path.exists(path) for path in entry["outputs"])
+
+    def record(self, stage, stage_fingerprint, outputs):
+        self.manifest[stage] = {
+            "fingerprint": stage_fingerprint,
+            "outputs": list(outputs),
+        }
+        os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+        logger.debug("Recorded fingerprint for stage %s", stage)
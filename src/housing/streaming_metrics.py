@@ -0,0 +1,103 @@
+import numpy as np
+
+from housing.streaming_stats import QuantileSketch
+
+ERROR_QUANTILES = (0.5, 0.9, 0.99)
+
+
+class RegressionAccumulator:
+    """Regression metrics built up chunk by chunk in constant memory.
+
+    Keeps the count, the mean and centred sum of squares of the labels, and
+    running sums of the residuals, so RMSE, MAE, R² and bias come out of a
+    single pass. The label moments are combined with Chan's pairwise update,
+    which lets accumulators from parallel workers or time windows be merged
+    without losing precision. Absolute-error quantiles come from a
+    ``QuantileSketch``.
+    """
+
+    def __init__(self, k=200, seed=42):
+        self.n = 0
+        self.label_mean = 0.0
+        self.label_m2 = 0.0
+        self.sum_error = 0.0
+        self.sum_abs_error = 0.0
+        self.sum_squared_error = 0.0
+        self.abs_errors = QuantileSketch(k, seed=seed)
+
+    def update(self, y_true, y_pred):
+        y_true = np.asarray(y_true, dtype=np.float64).ravel()
+        y_pred = np.asarray(y_pred, dtype=np.float64).ravel()
+        if y_true.shape != y_pred.shape:
+            raise ValueError(
+                f"y_true has {len(y_true)} values but y_pred has {len(y_pred)}"
+            )
+        errors = y_pred - y_true
+        if not len(y_true):
+            return self
+        label_mean = y_true.mean()
+        self._combine(
+            len(y_true),
+            label_mean,
+            np.square(y_true - label_mean).sum(),
+            errors.sum(),
+            np.abs(errors).sum(),
+            np.dot(errors, errors),
+        )
+        self.abs_errors.update(np.abs(errors))
+        return self
+
+    def _combine(self, n, label_mean, label_m2, sum_error, sum_abs, sum_squared):
+        total = self.n + n
+        delta = label_mean - self.label_mean
+        self.label_m2 += label_m2 + delta**2 * self.n * n / total
+        self.label_mean += delta * n / total
+        self.n = total
+        self.sum_error += sum_error
+        self.sum_abs_error += sum_abs
+        self.sum_squared_error += sum_squared
+
+    def merge(self, other):
+        """Fold another accumulator, e.g. from a worker or window, into this one."""
+        if other.n:
+            self._combine(
+                other.n,
+                other.label_mean,
+                other.label_m2,
+                other.sum_error,
+                other.sum_abs_error,
+                other.sum_squared_error,
+            )
+        self.abs_errors.merge(other.abs_errors)
+        return self
+
+    @property
+    def rmse(self):
+        return float(np.sqrt(self.sum_squared_error / self.n)) if self.n else np.nan
+
+    @property
+    def mae(self):
+        return float(self.sum_abs_error / self.n) if self.n else np.nan
+
+    @property
+    def bias(self):
+        """Mean of prediction minus label; positive when over-predicting."""
+        return float(self.sum_error / self.n) if self.n else np.nan
+
+    @property
+    def r2(self):
+        if not self.n:
+            return np.nan
+        # Constant labels follow sklearn's r2_score: 1 for a perfect fit, else 0
+        if self.label_m2 == 0:
+            return 1.0 if self.sum_squared_error == 0 else 0.0
+        return float(1 - self.sum_squared_error / self.label_m2)
+
+    def error_quantiles(self, q=ERROR_QUANTILES):
+        return self.abs_errors.quantile(np.asarray(q, dtype=np.float64))
+
+    def summary(self, q=ERROR_QUANTILES):
+        metrics = {"rmse": self.rmse, "mae": self.mae, "r2": self.r2, "bias": self.bias}
+        for quantile, value in zip(q, self.error_quantiles(q)):
+            metrics[f"abs_error_p{quantile * 100:g}"] = float(value)
+        return metrics
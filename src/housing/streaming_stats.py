@@ -0,0 +1,235 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+logger = logging.getLogger(__name__)
+
+# Capacity of each lower compactor relative to the one above it
+CAPACITY_DECAY = 2 / 3
+
+
+class QuantileSketch:
+    """Mergeable KLL quantile sketch over a stream of floats.
+
+    Values are kept in compactors where an item at level ``h`` stands for
+    ``2**h`` inputs. A full compactor is sorted and every other item, from
+    a random offset, is promoted to the next level, so at most about
+    ``3 * k`` items are kept however many values are added. Quantile rank
+    errors stay around ``1 / k`` of ``n``; tests/test_streaming_stats.py
+    checks ``2 / k``. NaNs are ignored; the exact minimum and maximum are
+    tracked. Compaction offsets are random, so ``seed`` is fixed by default
+    to make results repeatable.
+    """
+
+    def __init__(self, k=200, seed=42):
+        self.k = k
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.compactors = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.compactors) - level - 1
+        return max(int(np.ceil(self.k * CAPACITY_DECAY**depth)), 2)
+
+    def _compact(self, level):
+        if level + 1 == len(self.compactors):
+            self.compactors.append(np.empty(0))
+        items = np.sort(self.compactors[level])
+        # An odd item out, from either end, stays behind so the promoted
+        # pairs account for every input exactly
+        keep = items[:0]
+        if len(items) % 2:
+            keep, items = (
+                (items[:1], items[1:])
+                if self._rng.integers(2)
+                else (items[-1:], items[:-1])
+            )
+        offset = self._rng.integers(2)
+        promoted = items[offset::2]
+        self.compactors[level] = keep
+        self.compactors[level + 1] = np.concatenate(
+            [self.compactors[level + 1], promoted]
+        )
+
+    def _compress(self):
+        # Lazy compaction: only the lowest full level is compacted, and only
+        # while the sketch as a whole is over its total capacity
+        while sum(map(len, self.compactors)) > sum(
+            self._capacity(level) for level in range(len(self.compactors))
+        ):
+            level = next(
+                level
+                for level, items in enumerate(self.compactors)
+                if len(items) > self._capacity(level)
+            )
+            self._compact(level)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        self.n += len(values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.compactors[0] = np.concatenate([self.compactors[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Fold another sketch, e.g. from a parallel worker, into this one."""
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append(np.empty(0))
+        for level, items in enumerate(other.compactors):
+            self.compactors[level] = np.concatenate([self.compactors[level], items])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _weighted_items(self):
+        items = np.concatenate(self.compactors)
+        weights = np.concatenate(
+            [np.full(len(c), 2.0**level) for level, c in enumerate(self.compactors)]
+        )
+        order = np.argsort(items, kind="stable")
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        if self.n == 0:
+            return np.full(np.shape(q), np.nan)
+        items, cumulative = self._weighted_items()
+        ranks = np.asarray(q, dtype=np.float64) * cumulative[-1]
+        idx = np.minimum(np.searchsorted(cumulative, ranks), len(items) - 1)
+        values = items[idx]
+        # The extremes are known exactly
+        values = np.where(np.asarray(q) <= 0, self.min, values)
+        return np.where(np.asarray(q) >= 1, self.max, values)
+
+    def median(self):
+        return float(self.quantile(0.5))
+
+    def cdf(self, x):
+        """Approximate fraction of values <= ``x``."""
+        if self.n == 0:
+            return np.full(np.shape(x), np.nan)
+        items, cumulative = self._weighted_items()
+        idx = np.searchsorted(items, x, side="right")
+        below = np.where(idx > 0, cumulative[np.maximum(idx - 1, 0)], 0.0)
+        return below / cumulative[-1]
+
+    def histogram(self, bins):
+        """Approximate counts between consecutive ``bins`` edges."""
+        fractions = np.diff(self.cdf(np.asarray(bins, dtype=np.float64)))
+        return fractions * self.n
+
+
+class ColumnSketches:
+    """One quantile sketch per column of a frame or matrix."""
+
+    def __init__(self, columns, k=200, seed=42):
+        self.columns = list(columns)
+        seeds = np.random.SeedSequence(seed).spawn(len(self.columns))
+        self.sketches = {
+            col: QuantileSketch(k, seed=s) for col, s in zip(self.columns, seeds)
+        }
+
+    def update(self, data):
+        if isinstance(data, pd.DataFrame):
+            data = data[self.columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        data = np.asarray(data, dtype=np.float64)
+        for idx, col in enumerate(self.columns):
+            self.sketches[col].update(data[:, idx])
+        return self
+
+    def merge(self, other):
+        for col in self.columns:
+            self.sketches[col].merge(other.sketches[col])
+        return self
+
+    def quantiles(self, q=(0.25, 0.5, 0.75)):
+        return pd.DataFrame(
+            {col: self.sketches[col].quantile(np.asarray(q)) for col in self.columns},
+            index=pd.Index(q, name="quantile"),
+        )
+
+    def medians(self):
+        return np.array([self.sketches[col].median() for col in self.columns])
+
+
+def sketch_chunks(chunks, columns, k=200, n_jobs=None, seed=42):
+    """Sketch each chunk on a thread and merge the partial sketches.
+
+    NumPy sorts release the GIL, so chunks are summarised in parallel and
+    only the small sketches are combined.
+    """
+    with ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count()) as pool:
+        partials = list(
+            pool.map(
+                lambda chunk: ColumnSketches(columns, k, seed).update(chunk), chunks
+            )
+        )
+    if not partials:
+        return ColumnSketches(columns, k, seed)
+    merged = partials[0]
+    for partial in partials[1:]:
+        merged.merge(partial)
+    return merged
+
+
+def population_stability_index(reference, current, n_bins=10):
+    """PSI between two sketches over the reference's quantile bins."""
+    edges = np.unique(reference.quantile(np.linspace(0, 1, n_bins + 1)))
+    edges[0], edges[-1] = -np.inf, np.inf
+    expected = np.diff(reference.cdf(edges))
+    actual = np.diff(current.cdf(edges))
+    # Empty bins are floored so the log ratio stays finite
+    expected = np.clip(expected, 1e-4, None)
+    actual = np.clip(actual, 1e-4, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+class StreamingMedianImputer(TransformerMixin, BaseEstimator):
+    """Median imputer fitted from quantile sketches instead of sorted columns.
+
+    ``fit`` makes one pass over the data; ``partial_fit`` and ``merge``
+    allow fitting chunk by chunk or across workers. ``statistics_`` is the
+    same attribute ``SimpleImputer`` exposes.
+    """
+
+    def __init__(self, k=200, random_state=42):
+        self.k = k
+        self.random_state = random_state
+
+    def partial_fit(self, X, y=None):
+        X = np.asarray(X, dtype=np.float64)
+        if not hasattr(self, "sketches_"):
+            self.sketches_ = ColumnSketches(
+                range(X.shape[1]), self.k, seed=self.random_state
+            )
+        self.sketches_.update(X)
+        self.statistics_ = self.sketches_.medians()
+        return self
+
+    def fit(self, X, y=None):
+        if hasattr(self, "sketches_"):
+            del self.sketches_
+        return self.partial_fit(X)
+
+    def merge(self, other):
+        self.sketches_.merge(other.sketches_)
+        self.statistics_ = self.sketches_.medians()
+        return self
+
+    def transform(self, X):
+        X = np.array(X, dtype=np.float64)
+        missing = np.isnan(X)
+        np.copyto(X, np.broadcast_to(self.statistics_, X.shape), where=missing)
+        return X
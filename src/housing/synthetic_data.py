@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+OCEAN_PROXIMITY = ["<1H OCEAN", "INLAND", "ISLAND", "NEAR BAY", "NEAR OCEAN"]
+
+
+def synthetic_housing(n_rows, seed=42, missing_bedrooms_every=None):
+    """Raw housing rows, label included, in the columns of the census CSV.
+
+    Districts are spread over the data's California bounding box with room,
+    bedroom and population counts that scale together. With
+    ``missing_bedrooms_every`` every n-th ``total_bedrooms`` is left missing.
+    """
+    rng = np.random.default_rng(seed)
+    rooms = rng.uniform(200, 6000, n_rows)
+    households = rooms / rng.uniform(4, 6, n_rows)
+    data = pd.DataFrame(
+        {
+            "longitude": rng.uniform(-124.35, -114.31, n_rows),
+            "latitude": rng.uniform(32.54, 41.95, n_rows),
+            "housing_median_age": rng.integers(1, 52, n_rows).astype(float),
+            "total_rooms": rooms,
+            "total_bedrooms": rooms * rng.uniform(0.15, 0.25, n_rows),
+            "population": households * rng.uniform(2, 4, n_rows),
+            "households": households,
+            "median_income": rng.gamma(4.0, 1.0, n_rows),
+            "median_house_value": rng.uniform(15_000, 500_000, n_rows),
+            "ocean_proximity": rng.choice(OCEAN_PROXIMITY, n_rows),
+        }
+    )
+    if missing_bedrooms_every:
+        data.loc[::missing_bedrooms_every, "total_bedrooms"] = np.nan
+    return data
@@ -0,0 +1,137 @@
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import mlflow
+import mlflow.sklearn
+from mlflow.entities import Metric, Param
+from mlflow.tracking import MlflowClient
+from mlflow.utils.validation import MAX_METRICS_PER_BATCH, MAX_PARAMS_TAGS_PER_BATCH
+
+logger = logging.getLogger(__name__)
+
+# Rows used to infer model signatures and input examples
+SIGNATURE_SAMPLE_ROWS = 100
+
+
+class MlflowTracker:
+    """Buffer params and metrics for one MLflow run and flush them in batches.
+
+    Model artifacts are serialised and uploaded on a background thread, so
+    callers only pay for the upload when they ``close`` the tracker.
+    """
+
+    def __init__(self, run_id, client=None, executor=None, owns_run=False):
+        self.run_id = run_id
+        self.client = client or MlflowClient()
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="mlflow-upload"
+        )
+        self._owns_executor = executor is None
+        self._owns_run = owns_run
+        self._params = {}
+        self._metrics = []
+        self._uploads = []
+        self._children = []
+
+    @classmethod
+    def from_active_run(cls):
+        return cls(mlflow.active_run().info.run_id)
+
+    def child(self, run_name):
+        """Create a nested run sharing this tracker's upload thread."""
+        parent = self.client.get_run(self.run_id)
+        run = self.client.create_run(
+            parent.info.experiment_id,
+            run_name=run_name,
+            tags={"mlflow.parentRunId": self.run_id},
+        )
+        tracker = MlflowTracker(
+            run.info.run_id,
+            client=self.client,
+            executor=self._executor,
+            owns_run=True,
+        )
+        self._children.append(tracker)
+        return tracker
+
+    def log_param(self, key, value):
+        self._params[key] = value
+
+    def log_params(self, params):
+        self._params.update(params)
+
+    def log_metric(self, key, value, step=0):
+        timestamp = int(time.time() * 1000)
+        self._metrics.append(Metric(key, float(value), timestamp, step))
+
+    def log_metrics(self, metrics, step=0):
+        for key, value in metrics.items():
+            self.log_metric(key, value, step=step)
+
+    def log_model_async(self, model, artifact_path, X_sample):
+        """Queue a scikit-learn model upload with a signature from a sample."""
+        input_example, signature = None, None
+        # Transformers such as the imputer are logged without a signature
+        if hasattr(model, "predict"):
+            sample = X_sample.iloc[:SIGNATURE_SAMPLE_ROWS]
+            signature = mlflow.models.infer_signature(sample, model.predict(sample))
+            input_example = sample.iloc[:5]
+        future = self._executor.submit(
+            self._upload_model, model, artifact_path, input_example, signature
+        )
+        self._uploads.append(future)
+        return future
+
+    def _upload_model(self, model, artifact_path, input_example, signature):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            local_path = os.path.join(tmp_dir, artifact_path)
+            mlflow.sklearn.save_model(
+                model,
+                local_path,
+                signature=signature,
+                input_example=input_example,
+            )
+            self.client.log_artifacts(self.run_id, local_path, artifact_path)
+        logger.debug("Uploaded %s to run %s", artifact_path, self.run_id)
+
+    def flush(self):
+        params = [Param(key, str(value)) for key, value in self._params.items()]
+        # The tracking API caps how many entities a single batch may carry
+        while params:
+            batch, params = (
+                params[:MAX_PARAMS_TAGS_PER_BATCH],
+                params[MAX_PARAMS_TAGS_PER_BATCH:],
+            )
+            self.client.log_batch(self.run_id, params=batch)
+        metrics = self._metrics
+        while metrics:
+            batch, metrics = (
+                metrics[:MAX_METRICS_PER_BATCH],
+                metrics[MAX_METRICS_PER_BATCH:],
+            )
+            self.client.log_batch(self.run_id, metrics=batch)
+        self._params = {}
+        self._metrics = []
+
+    def close(self):
+        """Flush buffers, wait for pending uploads and end owned runs."""
+        self.flush()
+        for child in self._children:
+            child.close()
+        self._children = []
+        for future in self._uploads:
+            future.result()
+        self._uploads = []
+        if self._owns_run:
+            self.client.set_terminated(self.run_id)
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
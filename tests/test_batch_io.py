@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from housing.batch_io import read_batch, write_predictions
+from housing.data_preparation import prepare_data
+from housing.synthetic_data import synthetic_housing
+
+pa = pytest.importorskip("pyarrow")
+
+
+def test_arrow_batch_matches_dataframe_features(tmp_path):
+    data = synthetic_housing(200, missing_bedrooms_every=17)
+    path = str(tmp_path / "batch.arrow")
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    with pa.OSFile(path, "wb") as f, pa.ipc.new_stream(f, table.schema) as writer:
+        writer.write_table(table)
+
+    X_batch, _ = prepare_data(read_batch(path, "arrow"))
+    X_frame, _ = prepare_data(data)
+
+    np.testing.assert_array_equal(X_batch.to_numpy(), X_frame.to_numpy())
+    assert list(X_batch.columns) == list(X_frame.columns)
+
+
+def test_numpy_records_match_dataframe_features(tmp_path):
+    data = synthetic_housing(200, missing_bedrooms_every=17)
+    path = str(tmp_path / "batch.npy")
+    dtype = [(col, "f8") for col in data.columns[:-1]] + [("ocean_proximity", "U10")]
+    np.save(path, data.to_records(index=False).astype(dtype))
+
+    X_batch, _ = prepare_data(read_batch(path, "numpy"))
+    X_frame, _ = prepare_data(data)
+
+    np.testing.assert_array_equal(X_batch.to_numpy(), X_frame.to_numpy())
+
+
+def test_predictions_round_trip_in_request_format(tmp_path):
+    preds = np.linspace(1e5, 5e5, 11)
+
+    write_predictions(preds, str(tmp_path / "out.arrow"), "arrow")
+    with pa.memory_map(str(tmp_path / "out.arrow")) as source:
+        table = pa.ipc.open_stream(source).read_all()
+    np.testing.assert_array_equal(table.column("prediction").to_numpy(), preds)
+
+    write_predictions(preds, str(tmp_path / "out"), "numpy")
+    np.testing.assert_array_equal(np.load(tmp_path / "out")["prediction"], preds)
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from housing.feature_spec import DEFAULT_FEATURE_SPEC, compile_feature_spec
+
+
+def _raw():
+    return pd.DataFrame(
+        {
+            "longitude": [-122.23, -121.0, -118.3],
+            "latitude": [37.88, 38.0, 34.1],
+            "housing_median_age": [41.0, 20.0, 5.0],
+            "total_rooms": [880.0, 1000.0, 4000.0],
+            "total_bedrooms": [129.0, np.nan, 500.0],
+            "population": [322.0, 500.0, 1500.0],
+            "households": [126.0, 200.0, 400.0],
+            "median_income": [8.3252, 3.0, 5.5],
+            "ocean_proximity": ["NEAR BAY", "INLAND", "UNKNOWN"],
+        }
+    )
+
+
+def test_default_spec_matches_engineered_features():
+    X, imputer = compile_feature_spec().transform(_raw())
+
+    assert list(X.columns[-7:]) == [
+        "rooms_per_household",
+        "bedrooms_per_room",
+        "population_per_household",
+        "INLAND",
+        "ISLAND",
+        "NEAR BAY",
+        "NEAR OCEAN",
+    ]
+    assert np.allclose(X["rooms_per_household"], [880 / 126, 5.0, 10.0])
+    # Missing bedrooms and the derived ratio are filled with column medians
+    assert X.loc[1, "total_bedrooms"] == np.median([129.0, 500.0])
+    assert X.loc[1, "bedrooms_per_room"] == imputer.statistics_[9]
+    assert X[["INLAND", "NEAR BAY"]].to_numpy().tolist() == [[0, 1], [1, 0], [0, 0]]
+
+
+def test_custom_ops_and_fitted_imputer_reuse():
+    spec = dict(DEFAULT_FEATURE_SPEC)
+    spec["derived"] = [
+        {
+            "name": "income_x_age",
+            "op": "product",
+            "inputs": ["median_income", "housing_median_age"],
+        },
+        {"name": "log_population", "op": "log", "inputs": ["population"]},
+        {
+            "name": "income_bucket",
+            "op": "bucketize",
+            "inputs": ["median_income"],
+            "boundaries": [1.5, 4.5, 6.0],
+        },
+    ]
+    transform = compile_feature_spec(spec)
+    train, imputer = transform.transform(_raw())
+    assert np.allclose(train["log_population"], np.log([322.0, 500.0, 1500.0]))
+    assert train["income_bucket"].tolist() == [3.0, 1.0, 2.0]
+
+    one_row = _raw().iloc[[1]]
+    X, _ = transform.transform(one_row, imputer=imputer)
+    assert X["total_bedrooms"].iloc[0] == imputer.statistics_[4]
+
+
+def test_unknown_op_is_rejected():
+    spec = dict(DEFAULT_FEATURE_SPEC)
+    spec["derived"] = [{"name": "bad", "op": "sqrt", "inputs": ["population"]}]
+    with pytest.raises(ValueError):
+        compile_feature_spec(spec)
@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+
+from housing.load_testing import (
+    LATENCY_BUCKETS_MS,
+    compare_reports,
+    run_load,
+    summarize_load,
+    synthetic_requests,
+)
+
+
+class FakeTarget:
+    def __init__(self, fail_every=None):
+        self.sent = []
+        self.fail_every = fail_every
+        self._lock = threading.Lock()
+
+    def send(self, payload):
+        with self._lock:
+            self.sent.append(payload)
+            count = len(self.sent)
+        return not (self.fail_every and count % self.fail_every == 0)
+
+
+def test_synthetic_requests_group_rows():
+    payloads = synthetic_requests(5, rows_per_request=3)
+    assert len(payloads) == 5
+    assert all(len(payload) == 3 for payload in payloads)
+    assert "ocean_proximity" in payloads[0][0]
+
+
+def test_closed_loop_cycles_payloads():
+    payloads = synthetic_requests(3)
+    target = FakeTarget(fail_every=4)
+    results, wall_time = run_load(target, payloads, n_requests=8, concurrency=2)
+
+    assert len(results) == len(target.sent) == 8
+    assert sum(not ok for _, _, ok in results) == 2
+    assert wall_time > 0
+
+
+def test_open_loop_follows_schedule():
+    target = FakeTarget()
+    results, wall_time = run_load(
+        target, synthetic_requests(2), n_requests=10, qps=200, concurrency=2
+    )
+    offsets = sorted(offset for offset, _, _ in results)
+    assert len(results) == 10
+    assert offsets == pytest.approx([i / 200 for i in range(10)])
+    assert wall_time >= 9 / 200
+
+
+def test_summary_and_comparison():
+    results = [(0.0, 0.004, True), (0.1, 0.030, True), (0.2, 0.300, False)]
+    report = summarize_load(results, 2.0, [{"rss_mb": 100.0, "cpu_percent": 50.0}])
+    assert report["requests"] == 3 and report["errors"] == 1
+    assert report["throughput_rps"] == 1.5
+    assert report["latency_ms"]["max"] == pytest.approx(300)
+    assert sum(report["latency_histogram_ms"].values()) == 3
+    assert len(report["latency_histogram_ms"]) == len(LATENCY_BUCKETS_MS)
+
+    faster = summarize_load(results[:2], 1.0)
+    comparison = compare_reports(report, faster)
+    assert comparison.loc["throughput_rps", "change_pct"] == pytest.approx(33.333, 1e-3)
+    assert comparison.loc["max_ms", "after"] == pytest.approx(30)
+
+
+def test_summary_of_no_requests():
+    report = summarize_load([], 0.0)
+    assert report["requests"] == 0 and report["throughput_rps"] == 0.0
+    assert report["latency_ms"]["p50"] is None
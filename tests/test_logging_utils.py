@@ -0,0 +1,86 @@
+import json
+import logging
+
+import pytest
+
+from housing import logging_utils
+
+
+@pytest.fixture(autouse=True)
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    logging_utils.stop_logging_listener()
+    for handler in root.handlers:
+        if handler not in handlers:
+            handler.close()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def test_queue_logging_writes_json_lines(tmp_path):
+    log_path = tmp_path / "logs" / "run.log"
+    logging_utils.configure_logging(
+        log_level="INFO",
+        log_path=str(log_path),
+        console_log=False,
+        use_queue=True,
+        json_format=True,
+    )
+    logger = logging.getLogger("housing.test")
+    logger.info("Scored %s rows", 10, extra={"fields": {"model": "lr"}})
+    logging_utils.stop_logging_listener()
+
+    record = json.loads(log_path.read_text().strip())
+    assert record["message"] == "Scored 10 rows"
+    assert record["logger"] == "housing.test"
+    assert record["model"] == "lr"
+
+
+def test_queue_logging_keeps_exception_tracebacks(tmp_path):
+    log_path = tmp_path / "run.log"
+    logging_utils.configure_logging(
+        log_path=str(log_path), console_log=False, use_queue=True, json_format=True
+    )
+    try:
+        raise ValueError("bad row")
+    except ValueError:
+        logging.getLogger("housing.test").exception("Scoring failed")
+    logging_utils.stop_logging_listener()
+
+    record = json.loads(log_path.read_text().strip())
+    assert record["message"] == "Scoring failed"
+    assert "ValueError: bad row" in record["exc_info"]
+
+
+def test_sampling_keeps_one_in_n(tmp_path):
+    log_path = tmp_path / "run.log"
+    logging_utils.configure_logging(
+        log_path=str(log_path), console_log=False, sample_rate=10
+    )
+    logger = logging.getLogger("housing.test")
+    for i in range(100):
+        logger.info("Predicted row %s", i)
+    logger.warning("Always kept")
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+
+    lines = log_path.read_text().splitlines()
+    assert len(lines) == 11
+    assert "Always kept" in lines[-1]
+
+
+def test_sampling_keeps_one_in_n_per_handler(tmp_path, capsys):
+    log_path = tmp_path / "run.log"
+    logging_utils.configure_logging(
+        log_path=str(log_path), console_log=True, sample_rate=10
+    )
+    logger = logging.getLogger("housing.test")
+    for i in range(100):
+        logger.info("Predicted row %s", i)
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+
+    assert len(log_path.read_text().splitlines()) == 10
+    assert len(capsys.readouterr().err.splitlines()) == 10
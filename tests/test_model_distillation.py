@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from housing import model_distillation
+
+
+def _sample_data(n=300):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(n, 2)), columns=["a", "b"])
+    X["INLAND"] = rng.random(n) < 0.3
+    y = 3 * X["a"] + X["b"] ** 2 - 2 * X["INLAND"]
+    return X, y
+
+
+def test_augment_samples_keeps_indicators_one_hot():
+    X, _ = _sample_data()
+    synthetic = model_distillation.augment_samples(X, 500)
+
+    assert synthetic.shape == (500, 3)
+    assert synthetic["INLAND"].dtype == bool
+    assert synthetic["a"].between(X["a"].min(), X["a"].max()).all()
+
+
+def test_distilled_student_tracks_teacher():
+    X, y = _sample_data()
+    teacher = RandomForestRegressor(n_estimators=30, random_state=42).fit(X, y)
+    student = model_distillation.distill_model(teacher, X, "tree", max_depth=6)
+
+    gap = np.sqrt(np.mean((teacher.predict(X) - student.predict(X)) ** 2))
+    assert gap < 0.5 * y.std()
+    assert student.get_depth() <= 6
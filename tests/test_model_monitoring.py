@@ -0,0 +1,86 @@
+import json
+
+import numpy as np
+
+from housing.model_monitoring import (
+    check_data_drift,
+    generate_evidently_reports,
+    summarize_reports,
+)
+from housing.synthetic_data import synthetic_housing
+
+
+def _reports(tmp_path):
+    columns = ["median_income", "population", "median_house_value"]
+    train = synthetic_housing(400, seed=1)[columns]
+    test = synthetic_housing(400, seed=2)[columns]
+    test["median_income"] += 5
+    for frame in (train, test):
+        frame["prediction"] = frame["median_house_value"] * 1.05
+    return generate_evidently_reports(
+        train, test, str(tmp_path), "median_house_value", "linear_regression"
+    )
+
+
+def test_summarize_reports_takes_p_values_from_drift_score(tmp_path):
+    paths = _reports(tmp_path)
+    with open(paths["data_drift"]) as f:
+        report = json.load(f)
+    table = next(m for m in report["metrics"] if m["metric"] == "DataDriftTable")
+    raw = table["result"]["drift_by_columns"]
+
+    summary, column_drift = summarize_reports(paths)
+    rows = {row["column"]: row for row in column_drift}
+    assert rows["median_income"]["drift_detected"]
+    assert rows["median_income"]["stat_test"].endswith("p_value")
+    assert rows["median_income"]["p_value"] < 0.05
+    for column, info in raw.items():
+        assert "p_value" not in info
+        assert rows[column]["p_value"] == info["drift_score"]
+    assert summary["drifted_columns"] >= 1 and 0 < summary["r2"] <= 1
+
+
+def test_check_data_drift_reports_p_values(tmp_path, capsys):
+    paths = _reports(tmp_path)
+    drift_ratio, ok = check_data_drift(paths["data_drift"], drift_ratio_threshold=0.0)
+    assert drift_ratio > 0 and not ok
+    assert "p=0.0000, test=K-S p_value" in capsys.readouterr().out
+
+
+def test_summarize_reports_keeps_zero_p_values(tmp_path):
+    drift = {
+        "metrics": [
+            {
+                "metric": "DataDriftTable",
+                "result": {
+                    "drift_by_columns": {
+                        "median_income": {
+                            "column_name": "median_income",
+                            "column_type": "num",
+                            "stattest_name": "K-S p_value",
+                            "stattest_threshold": 0.05,
+                            "drift_score": 0.0,
+                            "drift_detected": True,
+                        },
+                        "population": {
+                            "column_name": "population",
+                            "column_type": "num",
+                            "stattest_name": "Wasserstein distance (normed)",
+                            "stattest_threshold": 0.1,
+                            "drift_score": 0.04,
+                            "drift_detected": False,
+                        },
+                    }
+                },
+            }
+        ]
+    }
+    performance = {"metrics": []}
+    paths = {"data_drift": tmp_path / "drift.json", "performance": tmp_path / "p.json"}
+    paths["data_drift"].write_text(json.dumps(drift))
+    paths["performance"].write_text(json.dumps(performance))
+
+    summary, column_drift = summarize_reports(paths)
+    assert column_drift[0]["p_value"] == 0.0
+    assert np.isnan(column_drift[1]["p_value"])
+    assert summary["drift_ratio"] == 0.5
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+
+from housing.data_preparation import prepare_data
+from housing.model_refresh import (
+    LinearSufficientStats,
+    applied_partitions,
+    partition_fingerprint,
+    record_lineage,
+    refresh_forest,
+)
+from housing.synthetic_data import synthetic_housing
+
+
+def _partition(n, seed):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n, 4)), columns=["a", "b", "c", "d"])
+    y = X @ np.array([3.0, -2.0, 0.5, 1.0]) + 7.0 + rng.normal(0, 0.1, n)
+    return X, y
+
+
+def test_sufficient_stats_match_full_linear_fit(tmp_path):
+    X_old, y_old = _partition(500, seed=0)
+    X_new, y_new = _partition(100, seed=1)
+
+    stats = LinearSufficientStats.from_data(X_old, y_old)
+    stats.save(str(tmp_path / "stats.pkl"))
+    stats = LinearSufficientStats.load(str(tmp_path / "stats.pkl"))
+    model = stats.update(X_new, y_new).to_model()
+
+    full = LinearRegression().fit(pd.concat([X_old, X_new]), np.r_[y_old, y_new])
+    assert stats.n == 600
+    assert np.allclose(model.coef_, full.coef_)
+    assert np.isclose(model.intercept_, full.intercept_)
+    assert np.allclose(model.predict(X_new), full.predict(X_new))
+
+
+def test_refresh_forest_adds_new_trees_and_prunes_oldest():
+    X_old, y_old = _partition(300, seed=0)
+    X_new, y_new = _partition(50, seed=1)
+    forest = RandomForestRegressor(n_estimators=10, random_state=42).fit(X_old, y_old)
+    original = list(forest.estimators_)
+
+    forest, pruned = refresh_forest(forest, X_new, y_new, n_new_trees=4)
+    assert pruned == 0 and len(forest.estimators_) == 14
+    assert forest.estimators_[:10] == original
+
+    forest, pruned = refresh_forest(forest, X_new, y_new, n_new_trees=4, max_trees=12)
+    assert pruned == 6 and len(forest.estimators_) == 12
+    assert forest.estimators_[:4] == original[6:]
+    assert forest.predict(X_new).shape == (50,)
+
+
+def test_record_lineage_appends(tmp_path):
+    path = str(tmp_path / "lineage.json")
+    record_lineage(path, {"model_type": "linear_regression", "version": "a"})
+    lineage = record_lineage(path, {"model_type": "linear_regression", "version": "b"})
+    assert [entry["version"] for entry in lineage] == ["a", "b"]
+
+
+def test_near_collinear_features_still_predict_like_full_fit():
+    X, y = _partition(1000, seed=0)
+    noise = np.random.default_rng(2).normal(0, 1e-6, len(X))
+    X["e"] = X["a"] + noise
+
+    model = LinearSufficientStats.from_data(X, y).to_model()
+    full = LinearRegression().fit(X, y)
+    # The split between the twin columns is arbitrary, their sum is not
+    assert np.isclose(model.coef_[0] + model.coef_[4], 3.0, atol=0.01)
+    rmse = np.sqrt(np.mean((model.predict(X) - y) ** 2))
+    full_rmse = np.sqrt(np.mean((full.predict(X) - y) ** 2))
+    assert rmse < full_rmse * 1.01
+
+
+def test_applied_partitions_per_model(tmp_path):
+    path = str(tmp_path / "lineage.json")
+    assert applied_partitions(path, "linear_regression") == set()
+    record_lineage(
+        path, {"model_type": "linear_regression", "partition_fingerprint": "p1"}
+    )
+    record_lineage(path, {"model_type": "random_forest_grid_search", "version": "x"})
+
+    assert applied_partitions(path, "linear_regression") == {"p1"}
+    assert applied_partitions(path, "random_forest_grid_search") == set()
+
+
+def test_mixed_scale_housing_features_match_full_fit():
+    # Room counts in the thousands next to 0/1 dummies, as in the real data
+    raw = synthetic_housing(16_000, seed=0)
+    X, _ = prepare_data(raw.drop("median_house_value", axis=1))
+    rng = np.random.default_rng(1)
+    true_coef = rng.normal(0, 1, X.shape[1]) * 1e4 / X.std().clip(lower=1e-3)
+    y = X @ true_coef.to_numpy() + 2e5 + rng.normal(0, 1000, len(X))
+
+    half = len(X) // 2
+    stats = LinearSufficientStats.from_data(X.iloc[:half], y.iloc[:half])
+    model = stats.update(X.iloc[half:], y.iloc[half:]).to_model()
+    full = LinearRegression().fit(X, y)
+
+    assert np.allclose(model.coef_, full.coef_, rtol=1e-6, atol=1e-6)
+    assert np.isclose(model.intercept_, full.intercept_, rtol=1e-6)
+    assert np.sqrt(np.mean((model.predict(X) - full.predict(X)) ** 2)) < 1e-3
+
+
+def test_partition_fingerprint_ignores_path(tmp_path, monkeypatch):
+    partition = tmp_path / "new.csv"
+    partition.write_text("longitude,latitude\n-122.2,37.9\n")
+    copy = tmp_path / "copy.csv"
+    copy.write_bytes(partition.read_bytes())
+    monkeypatch.chdir(tmp_path)
+
+    fingerprint = partition_fingerprint("new.csv")
+    assert partition_fingerprint("./new.csv") == fingerprint
+    assert partition_fingerprint(str(copy)) == fingerprint
+    copy.write_text("longitude,latitude\n-121.0,38.0\n")
+    assert partition_fingerprint(str(copy)) != fingerprint
@@ -0,0 +1,114 @@
+import threading
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+from sklearn.tree import DecisionTreeRegressor
+
+from housing import model_scoring
+
+
+class SlowModel:
+    """Records how many predictions overlap each timed call."""
+
+    active = 0
+    overlaps = []
+    lock = threading.Lock()
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, X):
+        with SlowModel.lock:
+            SlowModel.active += 1
+            self.calls += 1
+            timed = self.calls == 2
+        time.sleep(0.05)
+        with SlowModel.lock:
+            if timed:
+                SlowModel.overlaps.append(SlowModel.active)
+            SlowModel.active -= 1
+        return np.zeros(len(X))
+
+
+def test_score_models_compares_all_models(tmp_path):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(200, 3)), columns=["a", "b", "c"])
+    y = X["a"] * 2 - X["b"] + rng.normal(scale=0.1, size=200)
+    model_paths = {}
+    for model_type, model in [
+        ("linear_regression", LinearRegression()),
+        ("decision_tree", DecisionTreeRegressor(random_state=42)),
+    ]:
+        model_paths[model_type] = str(tmp_path / f"{model_type}.pkl")
+        joblib.dump(model.fit(X, y), model_paths[model_type])
+
+    comparison = model_scoring.score_models(model_paths, X, y, n_jobs=2)
+
+    assert list(comparison.index) == ["linear_regression", "decision_tree"]
+    _, rmse, mae = model_scoring.evaluate_model(model_paths["linear_regression"], X, y)
+    assert np.isclose(comparison.loc["linear_regression", "rmse"], rmse)
+    assert np.isclose(comparison.loc["linear_regression", "mae"], mae)
+    assert (comparison["latency_per_row_us"] > 0).all()
+    assert (comparison["model_size_mb"] > 0).all()
+
+    chunked = model_scoring.score_models(model_paths, X, y, n_jobs=2, chunk_rows=7)
+    for metric in ("rmse", "mae", "r2", "bias"):
+        assert np.allclose(chunked[metric], comparison[metric])
+
+
+def test_evaluate_chunks_matches_full_evaluation(tmp_path):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(1000, 3)), columns=["a", "b", "c"])
+    y = X["a"] * 2 - X["b"] + rng.normal(scale=0.1, size=1000)
+    model = LinearRegression().fit(X, y)
+    model_path = str(tmp_path / "model.pkl")
+    joblib.dump(model, model_path)
+
+    rows = np.array_split(np.arange(len(X)), 8)
+    chunks = ((X.iloc[chunk], y.iloc[chunk]) for chunk in rows)
+    metrics = model_scoring.evaluate_chunks(model, chunks)
+    _, rmse, mae = model_scoring.evaluate_model(model_path, X, y)
+    assert metrics.n == 1000
+    assert np.isclose(metrics.rmse, rmse)
+    assert np.isclose(metrics.mae, mae)
+
+
+def test_latency_is_timed_without_contention(tmp_path):
+    X = pd.DataFrame({"a": np.arange(10.0)})
+    model_paths = {}
+    for name in ("first", "second", "third"):
+        model_paths[name] = str(tmp_path / f"{name}.pkl")
+        joblib.dump(SlowModel(), model_paths[name])
+
+    comparison = model_scoring.score_models(model_paths, X, X["a"], n_jobs=3)
+    # The second predict of each model is the timed one and runs alone
+    assert SlowModel.overlaps == [1, 1, 1]
+    assert (comparison["latency_per_row_us"] >= 0.05 / 10 * 1e6).all()
+
+
+def test_latency_uses_a_bounded_sample(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(50, 2)), columns=["a", "b"])
+    y = X["a"] * 3
+    model_path = str(tmp_path / "lr.pkl")
+    joblib.dump(LinearRegression().fit(X, y), model_path)
+    monkeypatch.setattr(model_scoring, "LATENCY_SAMPLE_ROWS", 8)
+
+    predicted_rows = []
+    original_predict = LinearRegression.predict
+
+    def counting_predict(self, X):
+        predicted_rows.append(len(X))
+        return original_predict(self, X)
+
+    monkeypatch.setattr(LinearRegression, "predict", counting_predict)
+    model_scoring.score_models({"lr": model_path}, X, y, chunk_rows=20)
+    # Three scoring chunks, then one timed sample instead of a second full pass
+    assert predicted_rows == [17, 17, 16, 8]
+
+    empty = model_scoring.score_models({"lr": model_path}, X.iloc[:0], y.iloc[:0])
+    assert np.isnan(empty.loc["lr", "latency_per_row_us"])
+    assert np.isnan(empty.loc["lr", "rmse"])
@@ -11,6 +11,7 @@ def test_model_training():
         #"decision_tree",
         #"random_forest_random_search",
         #"random_forest_grid_search",
+        "hist_gradient_boosting",
     ]:
         model, rmse, mae = model_training.train_model(X, y, model_type)
         assert model is not None
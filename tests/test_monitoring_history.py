@@ -0,0 +1,87 @@
+import time
+
+import numpy as np
+
+from housing.monitoring_history import MonitoringHistory
+
+
+def _append_daily_runs(history, days, columns=15):
+    start = np.datetime64("2025-01-01T06:00:00")
+    for day in range(days):
+        summary = {
+            "run_id": f"run{day:04d}",
+            "timestamp": start + np.timedelta64(day, "D"),
+            "model_type": "random_forest_grid_search",
+            "model_version": "abc123",
+            "r2": 0.8 if day < days - 1 else 0.5,
+            "rmse": 48_000.0 + day % 7,
+            "mae": 32_000.0,
+            "drift_ratio": 0.1,
+            "drifted_columns": 1,
+            "drift_ok": True,
+            "perf_ok": day < days - 1,
+        }
+        column_drift = [
+            {
+                "column": f"col{col}",
+                "stat_test": "K-S p_value",
+                "drift_score": 0.5,
+                "p_value": np.nan,
+                "drift_detected": col == 0,
+            }
+            for col in range(columns)
+        ]
+        history.append_run(summary, column_drift)
+
+
+def test_history_appends_and_queries_trends(tmp_path):
+    history = MonitoringHistory(str(tmp_path / "history"))
+    _append_daily_runs(history, days=30)
+
+    runs = history.runs(model_type="random_forest_grid_search")
+    assert len(runs) == 30
+    assert runs["timestamp"].is_monotonic_increasing
+    assert len(history.runs(since="2025-01-25")) == 6
+
+    drift = history.column_drift(column="col0")
+    assert len(drift) == 30 and drift["drift_detected"].all()
+
+    trend = history.trend("r2", window=7)
+    # Only the final, degraded run falls outside the rolling band
+    assert trend["out_of_band"].tolist() == [False] * 29 + [True]
+
+
+def test_year_of_daily_runs_loads_quickly(tmp_path):
+    history = MonitoringHistory(str(tmp_path / "history"))
+    _append_daily_runs(history, days=365)
+
+    start = time.perf_counter()
+    trend = history.trend("rmse", window=30)
+    drift = history.column_drift()
+    elapsed = time.perf_counter() - start
+
+    assert len(trend) == 365
+    assert len(drift) == 365 * 15
+    assert elapsed < 1.0
+
+
+def test_trend_needs_two_runs_before_flagging(tmp_path):
+    history = MonitoringHistory(str(tmp_path / "history"))
+    _append_daily_runs(history, days=3)
+
+    trend = history.trend("rmse", window=7)
+    # rmse rises by one each day; a single prior run gives no band yet
+    assert np.isnan(trend["upper_bound"][:2]).all()
+    assert not trend["out_of_band"][:2].any()
+
+
+def test_interrupted_append_is_trimmed_on_load(tmp_path):
+    history = MonitoringHistory(str(tmp_path / "history"))
+    _append_daily_runs(history, days=3)
+    # Simulate a crash after only one column of a fourth run was renamed
+    path = history._column_path("runs", "r2")
+    np.save(path, np.append(np.load(path), 0.1))
+
+    runs = history.runs()
+    assert len(runs) == 3
+    assert runs["r2"].tolist() == [0.8, 0.8, 0.5]
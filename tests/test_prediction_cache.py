@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+from housing.prediction_cache import PredictionCache, artifact_version, row_keys
+
+
+def _rows():
+    return pd.DataFrame(
+        {
+            "longitude": [-122.23, -121.0, -122.23],
+            "latitude": [37.88, 38.0, 37.88],
+            "median_income": [8.3252, 3.0, 8.3252000000001],
+            "ocean_proximity": ["NEAR BAY", "INLAND", "NEAR BAY"],
+        }
+    )
+
+
+def test_row_keys_ignore_column_order_and_float_noise():
+    rows = _rows()
+    keys = row_keys(rows)
+    assert keys[0] == keys[2]
+    assert keys[0] != keys[1]
+    assert (row_keys(rows[rows.columns[::-1]]) == keys).all()
+
+
+def test_row_keys_keep_category_spelling():
+    # The feature transform matches categories exactly, so a differently
+    # spelled category can get a different prediction and needs its own key
+    rows = _rows().iloc[[0, 0]].assign(ocean_proximity=["NEAR BAY", "near bay "])
+    keys = row_keys(rows)
+    assert keys[0] != keys[1]
+
+
+def test_only_misses_reach_the_model():
+    calls = []
+
+    def predict_fn(raw_df):
+        calls.append(len(raw_df))
+        return raw_df["median_income"].to_numpy() * 10
+
+    cache = PredictionCache("v1", max_entries=10)
+    first = cache.predict(_rows().iloc[:2], predict_fn)
+    second = cache.predict(_rows(), predict_fn)
+
+    assert calls == [2]
+    assert np.allclose(second, [83.252, 30.0, 83.252])
+    assert np.allclose(first, second[:2])
+    assert cache.stats()["hit_rate"] == 0.6
+
+
+def test_lru_eviction_and_stale_version(tmp_path):
+    cache = PredictionCache("v1", max_entries=2)
+    rows = _rows().iloc[:2]
+    cache.predict(rows, lambda df: np.zeros(len(df)))
+    cache.predict(rows.assign(median_income=[1.0, 2.0]), lambda df: np.ones(len(df)))
+    assert len(cache) == 2
+    assert cache.stats()["evictions"] == 2
+
+    path = str(tmp_path / "cache.pkl")
+    cache.save(path)
+    assert len(PredictionCache.load(path, "v1")) == 2
+    assert len(PredictionCache.load(path, "v2")) == 0
+
+
+def test_version_covers_preprocessing_artifacts(tmp_path):
+    model, imputer = tmp_path / "model.pkl", tmp_path / "imputer.pkl"
+    model.write_bytes(b"model")
+    imputer.write_bytes(b"medians-1")
+    spec = {"numeric": ["median_income"]}
+
+    version = artifact_version(str(model), str(imputer), feature_spec=spec)
+    assert version == artifact_version(str(model), str(imputer), feature_spec=spec)
+    assert version != artifact_version(str(model), str(imputer))
+    assert version != artifact_version(
+        str(model), str(imputer), feature_spec={"numeric": ["population"]}
+    )
+    imputer.write_bytes(b"medians-2")
+    assert version != artifact_version(str(model), str(imputer), feature_spec=spec)
+
+
+def test_incomplete_rows_bypass_the_cache():
+    rows = _rows()
+    rows.loc[1, "median_income"] = np.nan
+    calls = []
+
+    def predict_fn(raw_df):
+        calls.append(len(raw_df))
+        return np.zeros(len(raw_df))
+
+    cache = PredictionCache("v1")
+    cache.predict(rows, predict_fn, cache_incomplete=False)
+    cache.predict(rows, predict_fn, cache_incomplete=False)
+
+    # Rows 0 and 2 share a key; the row with a missing value is never stored
+    assert calls == [3, 1]
+    assert len(cache) == 1
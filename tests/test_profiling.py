@@ -0,0 +1,48 @@
+import argparse
+import os
+import pstats
+from contextlib import nullcontext
+
+from housing.profiling import (
+    add_profiling_arguments,
+    profile_from_args,
+    profile_stage,
+    profiling_passthrough_args,
+)
+
+
+def _allocate_rows(n):
+    return [[i] * 10 for i in range(n)]
+
+
+def test_profile_stage_writes_profile_and_summary(tmp_path):
+    with profile_stage("train", str(tmp_path), top_n=5) as stem:
+        rows = _allocate_rows(20_000)
+    assert len(rows) == 20_000
+
+    for suffix in (".prof", ".tracemalloc", ".txt"):
+        assert os.path.exists(stem + suffix)
+    stats = pstats.Stats(stem + ".prof")
+    assert any(func[2] == "_allocate_rows" for func in stats.stats)
+
+    with open(stem + ".txt") as f:
+        summary = f.read()
+    assert "Top 5 functions by cumulative time" in summary
+    assert "test_profiling.py" in summary.split("allocation sites:")[1]
+
+
+def test_profiling_disabled_is_a_noop():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--log-path")
+    add_profiling_arguments(parser)
+
+    args = parser.parse_args([])
+    assert isinstance(profile_from_args(args, "score"), nullcontext)
+    assert profiling_passthrough_args(args) == []
+
+    args = parser.parse_args(["--profile", "--log-path", "logs/run/pipeline.log"])
+    assert profiling_passthrough_args(args)[:3] == [
+        "--profile",
+        "--profile-dir",
+        "logs/run",
+    ]
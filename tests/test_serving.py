@@ -0,0 +1,74 @@
+import http.client
+import json
+import os
+import signal
+import urllib.request
+
+import joblib
+import numpy as np
+from sklearn.linear_model import LinearRegression
+
+from housing.data_preparation import prepare_data
+from housing.serving import ModelPredictor, PreforkServer
+from housing.synthetic_data import synthetic_housing
+
+
+def _post(address, records, timeout=10):
+    request = urllib.request.Request(
+        f"http://{address[0]}:{address[1]}/predict",
+        data=json.dumps(records).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())["predictions"]
+
+
+def test_prefork_server_predicts_and_restarts_workers(tmp_path):
+    data = synthetic_housing(50)
+    X, imputer = prepare_data(data)
+    model = LinearRegression().fit(X, data["median_income"] * 50_000)
+    joblib.dump(model, tmp_path / "model.pkl")
+    joblib.dump(imputer, tmp_path / "imputer.pkl")
+
+    predictor = ModelPredictor(
+        str(tmp_path / "model.pkl"), imputer_path=str(tmp_path / "imputer.pkl")
+    )
+    server = PreforkServer(predictor, port=0, workers=2)
+    server.start()
+    try:
+        records = data.head(3).to_dict(orient="records")
+        expected = model.predict(X.head(3))
+        assert np.allclose(_post(server.address, records), expected)
+
+        crashed = next(iter(server.workers))
+        os.kill(crashed, signal.SIGKILL)
+        assert server.reap() == crashed
+        assert len(server.workers) == 2 and crashed not in server.workers
+        assert np.allclose(_post(server.address, records), expected)
+    finally:
+        server.stop()
+    assert server.workers == {}
+
+
+def test_keep_alive_client_does_not_hold_single_worker(tmp_path):
+    data = synthetic_housing(50)
+    X, imputer = prepare_data(data)
+    model = LinearRegression().fit(X, data["median_income"] * 50_000)
+    joblib.dump(model, tmp_path / "model.pkl")
+    joblib.dump(imputer, tmp_path / "imputer.pkl")
+
+    predictor = ModelPredictor(
+        str(tmp_path / "model.pkl"), imputer_path=str(tmp_path / "imputer.pkl")
+    )
+    server = PreforkServer(predictor, port=0, workers=1)
+    server.start()
+    try:
+        records = data.head(3).to_dict(orient="records")
+        idle = http.client.HTTPConnection(*server.address, timeout=5)
+        idle.request("POST", "/predict", json.dumps(records))
+        assert idle.getresponse().status == 200
+        # The first client never closes its side; the worker must move on
+        assert len(_post(server.address, records, timeout=3)) == 3
+        idle.close()
+    finally:
+        server.stop()
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from housing.spatial_features import SpatialNeighborIndex, apply_spatial_features
+from housing.synthetic_data import synthetic_housing
+
+
+def _districts(n=500):
+    data = synthetic_housing(n, seed=0)
+    return data, data.pop("median_house_value").to_numpy()
+
+
+def _brute_force_neighbors(data, row, k, leave_one_out):
+    lat = np.radians(data["latitude"].to_numpy())
+    lon = np.radians(data["longitude"].to_numpy())
+    a = (
+        np.sin((lat - lat[row]) / 2) ** 2
+        + np.cos(lat) * np.cos(lat[row]) * np.sin((lon - lon[row]) / 2) ** 2
+    )
+    order = np.argsort(2 * np.arcsin(np.sqrt(a)))
+    start = 1 if leave_one_out else 0
+    return order[start:][:k]
+
+
+def test_neighbor_aggregates_match_brute_force():
+    data, target = _districts()
+    features = SpatialNeighborIndex(k=5).fit_transform(data, target)
+
+    for row in (0, 17, 250):
+        neighbors = _brute_force_neighbors(data, row, 5, leave_one_out=True)
+        assert np.isclose(
+            features["neighbor_target_mean"][row], target[neighbors].mean()
+        )
+        assert np.isclose(
+            features["neighbor_median_income"][row],
+            np.median(data["median_income"].to_numpy()[neighbors]),
+        )
+
+
+def test_leave_one_out_excludes_row_with_duplicated_coordinates():
+    data, target = _districts(1000)
+    # Every district gets a twin at the same coordinates, as in the census data
+    data = pd.concat([data, data], ignore_index=True)
+    target = np.concatenate([target, target + 1])
+    twins = np.r_[np.arange(1000, 2000), np.arange(1000)]
+
+    features = SpatialNeighborIndex(k=1).fit_transform(data, target)
+    assert np.array_equal(features["neighbor_target_mean"], target[twins])
+    assert (features["neighbor_distance_km"] == 0).all()
+
+
+def test_apply_spatial_features_persists_index(tmp_path):
+    data, target = _districts()
+    config = {
+        "spatial_features": {
+            "enabled": True,
+            "k": 5,
+            "index_path": str(tmp_path / "spatial_index.pkl"),
+        }
+    }
+    X = pd.DataFrame({"median_income": data["median_income"]})
+
+    X_train = apply_spatial_features(X, data, config, target=target)
+    X_new = apply_spatial_features(X.iloc[:3], data.iloc[:3], config)
+
+    assert list(X_train.columns[-3:]) == [
+        "neighbor_median_income",
+        "neighbor_target_mean",
+        "neighbor_distance_km",
+    ]
+    # Without leave-one-out each district is its own nearest neighbour
+    assert (X_new["neighbor_distance_km"] < X_train["neighbor_distance_km"][:3]).all()
+    config["spatial_features"]["enabled"] = False
+    assert apply_spatial_features(X, data, config) is X
@@ -0,0 +1,38 @@
+from housing.stage_cache import StageCache, fingerprint
+
+
+def test_fingerprint_tracks_files_and_selected_config_keys(tmp_path):
+    data = tmp_path / "housing.csv"
+    data.write_text("a,b\n1,2\n")
+    config = {"linear_regression": "lr.pkl", "decision_tree": "dt.pkl"}
+
+    base = fingerprint(files=[str(data)], config=config, keys=["linear_regression"])
+    changed_other = {**config, "decision_tree": "dt_v2.pkl"}
+    assert base == fingerprint(
+        files=[str(data)], config=changed_other, keys=["linear_regression"]
+    )
+
+    data.write_text("a,b\n1,3\n")
+    assert base != fingerprint(
+        files=[str(data)], config=config, keys=["linear_regression"]
+    )
+
+
+def test_stage_is_fresh_only_with_matching_fingerprint_and_outputs(tmp_path):
+    manifest = str(tmp_path / "manifest.json")
+    output = tmp_path / "model.pkl"
+    output.write_text("model")
+
+    cache = StageCache(manifest)
+    assert not cache.is_fresh("train:linear_regression", "abc")
+    cache.record("train:linear_regression", "abc", [str(output)])
+
+    reloaded = StageCache(manifest)
+    assert reloaded.is_fresh("train:linear_regression", "abc")
+    assert not reloaded.is_fresh("train:linear_regression", "def")
+    assert not StageCache(manifest, force=True).is_fresh(
+        "train:linear_regression", "abc"
+    )
+
+    output.unlink()
+    assert not reloaded.is_fresh("train:linear_regression", "abc")
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from housing.streaming_metrics import RegressionAccumulator
+
+
+def _labels_and_predictions(n, seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.lognormal(12, 0.5, n)
+    return y, y * rng.normal(1.02, 0.1, n)
+
+
+def test_chunked_metrics_match_sklearn():
+    y, preds = _labels_and_predictions(100_000)
+    metrics = RegressionAccumulator(seed=0)
+    for y_chunk, pred_chunk in zip(np.array_split(y, 13), np.array_split(preds, 13)):
+        metrics.update(y_chunk, pred_chunk)
+
+    assert metrics.n == len(y)
+    assert metrics.rmse == pytest.approx(np.sqrt(mean_squared_error(y, preds)))
+    assert metrics.mae == pytest.approx(mean_absolute_error(y, preds))
+    assert metrics.r2 == pytest.approx(r2_score(y, preds))
+    assert metrics.bias == pytest.approx(np.mean(preds - y))
+
+    # Quantiles carry the sketch's rank guarantee, checked against 2 / k
+    abs_errors = np.sort(np.abs(preds - y))
+    q = np.array([0.5, 0.9, 0.99])
+    ranks = np.searchsorted(abs_errors, metrics.error_quantiles(q), side="right")
+    assert np.abs(ranks / len(y) - q).max() < 2 / 200
+
+
+def test_merged_windows_equal_one_pass():
+    y, preds = _labels_and_predictions(30_000)
+    # Windows with very different label levels exercise the pairwise update
+    y[:10_000] += 1e6
+    preds[:10_000] += 1e6
+    windows = [
+        RegressionAccumulator().update(y[rows], preds[rows])
+        for rows in np.array_split(np.arange(len(y)), 3)
+    ]
+    merged = RegressionAccumulator()
+    for window in windows:
+        merged.merge(window)
+    single = RegressionAccumulator().update(y, preds)
+
+    assert merged.n == single.n
+    for name in ("rmse", "mae", "r2", "bias"):
+        assert getattr(merged, name) == pytest.approx(getattr(single, name))
+    assert merged.r2 == pytest.approx(r2_score(y, preds))
+
+
+def test_empty_and_constant_labels():
+    assert np.isnan(RegressionAccumulator().rmse)
+    assert RegressionAccumulator().update([3.0, 3.0], [3.0, 3.0]).r2 == 1.0
+    assert RegressionAccumulator().update([3.0, 3.0], [2.0, 4.0]).r2 == 0.0
+    summary = RegressionAccumulator().update([1.0, 2.0], [1.5, 2.5]).summary()
+    assert set(summary) == {
+        "rmse",
+        "mae",
+        "r2",
+        "bias",
+        "abs_error_p50",
+        "abs_error_p90",
+        "abs_error_p99",
+    }
+
+
+def test_mismatched_lengths_are_rejected():
+    with pytest.raises(ValueError):
+        RegressionAccumulator().update([1.0, 2.0, 3.0], [2.0])
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+from sklearn.impute import SimpleImputer
+
+from housing.feature_spec import DEFAULT_FEATURE_SPEC, compile_feature_spec
+from housing.streaming_stats import (
+    QuantileSketch,
+    StreamingMedianImputer,
+    population_stability_index,
+    sketch_chunks,
+)
+
+QUANTILES = np.array([0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99])
+
+
+def _rank_error(values, estimates, q):
+    ranks = np.searchsorted(np.sort(values), estimates, side="right") / len(values)
+    return np.abs(ranks - q).max()
+
+
+def test_rank_error_stays_within_two_over_k():
+    # Documented bound: each estimated quantile is within 2 / k of the
+    # requested rank; a few hundred retained values summarise 10^6 inputs
+    values = np.random.default_rng(0).lognormal(0, 1, 1_000_000)
+    for k in (100, 200, 400):
+        sketch = QuantileSketch(k, seed=1)
+        for chunk in np.array_split(values, 20):
+            sketch.update(chunk)
+
+        assert sketch.n == len(values)
+        assert _rank_error(values, sketch.quantile(QUANTILES), QUANTILES) < 2 / k
+        assert sum(map(len, sketch.compactors)) <= 3 * k
+    assert sketch.quantile(0.0) == values.min()
+    assert sketch.quantile(1.0) == values.max()
+
+
+def test_merged_parallel_sketches_keep_the_bound():
+    data = np.random.default_rng(0).normal(size=(200_000, 3))
+    data[::50, 1] = np.nan
+    merged = sketch_chunks(np.array_split(data, 8), columns=["a", "b", "c"], k=200)
+
+    for idx, col in enumerate(merged.columns):
+        column = data[:, idx][~np.isnan(data[:, idx])]
+        sketch = merged.sketches[col]
+        assert sketch.n == len(column)
+        assert _rank_error(column, sketch.quantile(QUANTILES), QUANTILES) < 2 / 200
+
+
+def test_streaming_imputer_medians_close_to_exact():
+    rng = np.random.default_rng(0)
+    X = rng.gamma(2.0, 1.0, size=(100_000, 4))
+    X[rng.random(X.shape) < 0.05] = np.nan
+
+    exact = SimpleImputer(strategy="median").fit(X).statistics_
+    approximate = StreamingMedianImputer(k=200).fit(X).statistics_
+    for col in range(X.shape[1]):
+        observed = X[:, col][~np.isnan(X[:, col])]
+        assert _rank_error(observed, approximate[col], 0.5) < 2 / 200
+        assert abs(approximate[col] - exact[col]) / exact[col] < 0.02
+
+    filled = StreamingMedianImputer(k=200).fit(X).transform(X)
+    assert not np.isnan(filled).any()
+
+
+def test_feature_spec_fits_sketch_imputer_from_chunks():
+    rng = np.random.default_rng(0)
+    n = 20_000
+    raw = pd.DataFrame(
+        {col: rng.uniform(1, 100, n) for col in DEFAULT_FEATURE_SPEC["numeric"]}
+    )
+    raw["ocean_proximity"] = "INLAND"
+    raw.loc[::10, "total_bedrooms"] = np.nan
+
+    spec = {**DEFAULT_FEATURE_SPEC, "imputer": {"strategy": "approximate_median"}}
+    transform = compile_feature_spec(spec)
+    chunks = (raw.iloc[rows] for rows in np.array_split(np.arange(n), 4))
+    imputer = transform.fit_imputer(chunks)
+
+    X, fitted = transform.transform(raw)
+    assert isinstance(fitted, StreamingMedianImputer)
+    assert np.allclose(imputer.statistics_, fitted.statistics_, rtol=0.05)
+    assert not X.isna().any().any()
+
+
+def test_population_stability_index_flags_shift():
+    rng = np.random.default_rng(0)
+    reference = QuantileSketch(seed=0).update(rng.normal(0, 1, 50_000))
+    same = QuantileSketch(seed=1).update(rng.normal(0, 1, 50_000))
+    shifted = QuantileSketch(seed=2).update(rng.normal(1, 1, 50_000))
+
+    assert population_stability_index(reference, same) < 0.01
+    assert population_stability_index(reference, shifted) > 0.25
+
+
+def test_default_seed_makes_imputer_repeatable():
+    X = np.random.default_rng(0).lognormal(size=(50_000, 3))
+    first = StreamingMedianImputer(k=50).fit(X).statistics_
+    second = StreamingMedianImputer(k=50).fit(X).statistics_
+    assert np.array_equal(first, second)
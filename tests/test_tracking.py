@@ -0,0 +1,31 @@
+import mlflow
+import numpy as np
+import pandas as pd
+from mlflow.tracking import MlflowClient
+from sklearn.linear_model import LinearRegression
+
+from housing.tracking import MlflowTracker
+
+
+def test_tracker_batches_params_metrics_and_model(tmp_path, monkeypatch):
+    monkeypatch.setenv("MLFLOW_ALLOW_FILE_STORE", "true")
+    mlflow.set_tracking_uri("file://" + str(tmp_path / "mlruns"))
+    X = pd.DataFrame({"a": np.arange(20.0), "b": np.arange(20.0) ** 2})
+    y = 3 * X["a"] + 1
+    model = LinearRegression().fit(X, y)
+
+    with mlflow.start_run() as run:
+        with MlflowTracker.from_active_run() as tracker:
+            tracker.log_params({f"p{i}": i for i in range(150)})
+            child = tracker.child("linear_regression")
+            child.log_metrics({"RMSE": 0.5, "MAE": 0.25})
+            child.log_model_async(model, "linear_regression", X)
+
+    client = MlflowClient()
+    assert len(client.get_run(run.info.run_id).data.params) == 150
+    child_run = client.get_run(child.run_id)
+    assert child_run.data.metrics == {"RMSE": 0.5, "MAE": 0.25}
+    assert child_run.data.tags["mlflow.parentRunId"] == run.info.run_id
+    assert child_run.info.status == "FINISHED"
+    artifacts = [a.path for a in client.list_artifacts(child.run_id)]
+    assert "linear_regression" in artifacts